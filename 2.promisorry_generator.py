@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from sqlalchemy import and_
 from app import app
 from models import db, Account, PromissoryRequest
+from analytics import rebuild_rollup
 
 # -------------------------
 # CONFIG
@@ -101,6 +102,7 @@ with app.app_context():
             created += 1
 
     db.session.commit()
+    rebuild_rollup()
 
 print("✔ DONE INSERTING PROMISSORY NOTES")
 print(f"Total created: {created}")
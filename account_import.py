@@ -0,0 +1,136 @@
+import multiprocessing
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from sqlalchemy import insert, select
+from werkzeug.security import generate_password_hash
+from models import db, Account
+
+IMPORT_COLUMNS = ["first_name", "middle_name", "last_name", "suffix",
+                  "email", "role", "status", "year_level", "course"]
+ROLES = ("Admin", "Finance", "Student")
+STATUSES = ("Active", "Inactive")
+EMAIL_PATTERN = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+
+LOOKUP_CHUNK = 500
+INSERT_CHUNK = 500
+PARALLEL_HASH_MIN = 50
+
+ImportResult = namedtuple("ImportResult", "created errors")
+RowError = namedtuple("RowError", "row email message")
+
+
+#READ
+def read_accounts(fileobj, filename):
+    """Load an uploaded CSV/Excel sheet as strings. Returns None for other file types."""
+    if filename.endswith(".csv"):
+        df = pd.read_csv(fileobj, dtype=str, keep_default_na=False)
+    elif filename.endswith((".xlsx", ".xls")):
+        df = pd.read_excel(fileobj, dtype=str, keep_default_na=False)
+    else:
+        return None
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    df = df.reindex(columns=IMPORT_COLUMNS, fill_value="").fillna("")
+    return df.apply(lambda column: column.astype(str).str.strip())
+
+
+#VALIDATE
+def existing_emails(emails):
+    """Emails from ``emails`` that already have an account, via chunked IN lookups."""
+    emails = list(emails)
+    found = set()
+    for start in range(0, len(emails), LOOKUP_CHUNK):
+        chunk = emails[start:start + LOOKUP_CHUNK]
+        found.update(db.session.scalars(select(Account.email).where(Account.email.in_(chunk))))
+    return found
+
+
+def validate_accounts(df):
+    """Normalize role/status and return ``(valid_rows, errors)``.
+
+    Every rule is evaluated column-wise over the whole sheet; a row with
+    any failure is reported with all of its messages and left out.
+    """
+    df = df.copy()
+    df["role"] = df["role"].str.capitalize().replace("", "Student")
+    df["status"] = df["status"].str.capitalize().replace("", "Inactive")
+
+    has_email = df["email"] != ""
+    checks = [
+        (~has_email, "Missing email"),
+        (has_email & ~df["email"].str.match(EMAIL_PATTERN), "Invalid email"),
+        (df["first_name"] == "", "Missing first name"),
+        (df["last_name"] == "", "Missing last name"),
+        (~df["role"].isin(ROLES), "Unknown role"),
+        (~df["status"].isin(STATUSES), "Unknown status"),
+        (has_email & df["email"].duplicated(keep="first"), "Duplicate email in file"),
+        (df["email"].isin(existing_emails(df.loc[has_email, "email"].unique())), "Email already exists"),
+    ]
+    for column in IMPORT_COLUMNS:
+        length = Account.__table__.c[column].type.length
+        checks.append((df[column].str.len() > length, f"{column} longer than {length} characters"))
+
+    failed = pd.DataFrame({message: mask for mask, message in checks})
+    bad = failed.any(axis=1)
+    errors = [
+        RowError(index + 2, df.at[index, "email"], "; ".join(failed.columns[failed.loc[index]]))
+        for index in df.index[bad]
+    ]
+    return df[~bad], errors
+
+
+#HASH & INSERT
+def hash_passwords(passwords, workers=None):
+    """Hash ``passwords`` across a process pool; small batches are hashed inline."""
+    passwords = list(passwords)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(passwords) < PARALLEL_HASH_MIN:
+        return [generate_password_hash(p) for p in passwords]
+
+    # spawn, not fork: the app process runs background threads (audit writer).
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        chunksize = max(1, len(passwords) // (workers * 4))
+        return list(pool.map(generate_password_hash, passwords, chunksize=chunksize))
+
+
+def insert_accounts(rows, chunk_size=INSERT_CHUNK):
+    """Bulk insert account dicts (table column names) in chunks, without committing."""
+    table = Account.__table__
+    for start in range(0, len(rows), chunk_size):
+        db.session.execute(insert(table), rows[start:start + chunk_size])
+
+
+def import_accounts(df, make_password, workers=None):
+    """Validate, hash and insert the accounts in ``df`` in one transaction.
+
+    ``make_password(last_name)`` supplies each new account's initial
+    password. Returns an ImportResult with the created accounts' full
+    names and a RowError per rejected row.
+    """
+    valid, errors = validate_accounts(df)
+    if valid.empty:
+        return ImportResult([], errors)
+
+    passwords = [make_password(last_name) for last_name in valid["last_name"]]
+    hashes = hash_passwords(passwords, workers)
+
+    is_student = valid["role"] == "Student"
+    valid = valid.assign(
+        password_hash=hashes,
+        plain_password=passwords,
+        year_level=valid["year_level"].where(is_student, None),
+        course=valid["course"].where(is_student, None)
+    )
+    rows = valid.to_dict("records")
+    insert_accounts(rows)
+    db.session.commit()
+
+    names = [" ".join(filter(None, [r["first_name"], r["middle_name"], r["last_name"], r["suffix"]]))
+             for r in rows]
+    return ImportResult(names, errors)
+
+
+def error_report_rows(errors):
+    return [(e.row, e.email, e.message) for e in errors]
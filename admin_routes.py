@@ -1,11 +1,23 @@
-from flask import Blueprint, render_template, redirect, url_for, request, send_file, flash, session
+from flask import Blueprint, render_template, redirect, url_for, request, send_file, flash, session, current_app
 import pandas as pd
 import io
+import os
+import csv
+import uuid
 import random
 import string
 from models import db, Account, ActiveSettings, ActiveCourse, SystemLog
+from analytics import account_counts, invalidate_analytics
+from export_jobs import ExportSpec, export_kind, start_export
+from catalogs import invalidate_catalogs
+from pagination import keyset_paginate
+from search import account_search_criterion
+from audit import log_action, flush_audit_log
+from settings import get_active_settings, invalidate_settings
+from principal import invalidate_principals
+from profiler import profile_report, profiling_enabled, reset_profile, REPEAT_THRESHOLD
+from account_import import IMPORT_COLUMNS, read_accounts, import_accounts, error_report_rows
 from functools import wraps
-from datetime import datetime
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin",
                      template_folder="templates")
@@ -37,38 +49,19 @@ def require_role(role=None):
     return wrapper
 
 
-def log_action(user_name, action):
-    """Helper to log system actions."""
-    log = SystemLog(user_name=user_name, action=action,
-                    timestamp=datetime.utcnow())
-    db.session.add(log)
-    db.session.commit()
-
-
-def get_active_settings():
-    settings = ActiveSettings.query.first()
-    if not settings:
-        return "Not Set", "Not Set"
-    return settings.active_semester, settings.active_school_year
-
 #DASHBOARD
 @admin_bp.route("/dashboard")
 @require_role("Admin")
 def dashboard():
-    total_active = Account.query.filter_by(_status="Active").count()
-    total_inactive = Account.query.filter_by(_status="Inactive").count()
-    total_active_students = Account.query.filter_by(
-        _status="Active", _role="Student").count()
-    total_active_finance = Account.query.filter_by(
-        _status="Active", _role="Finance").count()
-    total_active_admin = Account.query.filter_by(
-        _status="Active", _role="Admin").count()
+    counts = account_counts()
+    total_active = sum(n for (status, _), n in counts.items() if status == "Active")
+    total_inactive = sum(n for (status, _), n in counts.items() if status == "Inactive")
+    total_active_students = counts.get(("Active", "Student"), 0)
+    total_active_finance = counts.get(("Active", "Finance"), 0)
+    total_active_admin = counts.get(("Active", "Admin"), 0)
 
-    active_settings = ActiveSettings.query.first()
-    active_semester = active_settings.active_semester if active_settings else "Not Set"
-    active_school_year = active_settings.active_school_year if active_settings else "Not Set"
-    active_course = getattr(
-        active_settings, 'active_course', 'Not Set (using list model)')
+    active_semester, active_school_year = get_active_settings()
+    active_course = 'Not Set (using list model)'
 
     data = {
         "total_active_accounts": total_active,
@@ -92,28 +85,27 @@ def accounts():
     search = request.args.get("search", "").strip()
     role_filter = request.args.get("role", "").strip().capitalize()
     status_filter = request.args.get("status", "").strip().capitalize()
-    page = request.args.get("page", 1, type=int)
+    cursor = request.args.get("cursor")
     per_page = 10
 
     query = Account.query
     if search:
-        query = query.filter(
-            (Account.first_name.ilike(f"%{search}%")) |
-            (Account.last_name.ilike(f"%{search}%")) |
-            (Account.email.ilike(f"%{search}%"))
-        )
+        query = query.filter(account_search_criterion(search))
     if role_filter:
         query = query.filter(Account._role == role_filter)
     if status_filter:
         query = query.filter(Account._status == status_filter)
 
-    pagination = query.order_by(Account.id.desc()).paginate(
-        page=page, per_page=per_page, error_out=False)
+    pagination = keyset_paginate(
+        query,
+        order=[(Account.id, "desc")],
+        key=lambda a: (a.id,),
+        cursor=cursor,
+        per_page=per_page
+    )
 
-    active_settings = ActiveSettings.query.first()
-    active_semester = active_settings.active_semester if active_settings else "Not Set"
-    active_school_year = active_settings.active_school_year if active_settings else "Not Set"
-    active_course = getattr(active_settings, 'active_course', 'Not Set')
+    active_semester, active_school_year = get_active_settings()
+    active_course = 'Not Set'
 
     log_action(session.get("user_name", "Admin User"), f"Viewed accounts page")
 
@@ -121,8 +113,8 @@ def accounts():
         "admin/accounts.html",
         accounts=pagination.items,
         pagination=pagination,
-        page=page,
-        total_pages=pagination.pages,
+        page=pagination.page,
+        total_pages=pagination.pages_label,
         admin_user=session.get("user_name", "Admin User"),
         search=search,
         role_filter=role_filter,
@@ -168,6 +160,7 @@ def add_new_account():
         account.set_password(password)
         db.session.add(account)
         db.session.commit()
+        invalidate_analytics()
 
         log_action(session.get("user_name", "Admin User"),
                    f"Added new account: {account.full_name} ({email})")
@@ -212,6 +205,8 @@ def edit_account(account_id):
                 account.course = None
 
             db.session.commit()
+            invalidate_principals()
+            invalidate_analytics()
             flash("Account updated successfully", "success")
             log_action(session.get("user_name", "Admin User"),
                        f"Updated account: {account.full_name}")
@@ -227,17 +222,24 @@ def edit_account(account_id):
 def logs():
     user_filter = request.args.get('user', '').strip()
     action_filter = request.args.get('action', '').strip()
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     per_page = 10
 
+    # Show entries still waiting in this worker's audit buffer.
+    flush_audit_log()
     query = SystemLog.query
     if user_filter:
         query = query.filter(SystemLog.user_name.ilike(f'%{user_filter}%'))
     if action_filter:
         query = query.filter(SystemLog.action.ilike(f'%{action_filter}%'))
 
-    logs_pagination = query.order_by(SystemLog.timestamp.desc()).paginate(
-        page=page, per_page=per_page, error_out=False)
+    logs_pagination = keyset_paginate(
+        query,
+        order=[(SystemLog.timestamp, "desc"), (SystemLog.id, "desc")],
+        key=lambda log: (log.timestamp, log.id),
+        cursor=cursor,
+        per_page=per_page
+    )
 
     active_semester, active_school_year = get_active_settings()
 
@@ -248,7 +250,26 @@ def logs():
         active_school_year=active_school_year,
         user_filter=user_filter,
         action_filter=action_filter,
-        total_pages=logs_pagination.pages
+        total_pages=logs_pagination.pages_label
+    )
+
+#SQL PROFILE
+@admin_bp.route("/sql-profile", methods=["GET", "POST"])
+@require_role("Admin")
+def sql_profile():
+    if request.method == "POST":
+        reset_profile()
+        flash("SQL profile cleared.", "success")
+        return redirect(url_for("admin.sql_profile"))
+
+    active_semester, active_school_year = get_active_settings()
+    return render_template(
+        "admin/sql_profile.html",
+        routes=profile_report(),
+        enabled=profiling_enabled(current_app),
+        repeat_threshold=REPEAT_THRESHOLD,
+        active_semester=active_semester,
+        active_school_year=active_school_year
     )
 
 #ACTIVE SEMESTER
@@ -260,12 +281,14 @@ def semester():
         active_settings = ActiveSettings()
         db.session.add(active_settings)
         db.session.commit()
+        invalidate_settings()
 
     if request.method == "POST":
         old_semester = active_settings.active_semester
         active_settings.active_semester = request.form.get(
             "semester", "").strip()
         db.session.commit()
+        invalidate_settings()
         flash("Active semester updated successfully!", "success")
         log_action(session.get("user_name", "Admin User"),
                    f"Changed semester from '{old_semester}' to '{active_settings.active_semester}'")
@@ -282,12 +305,14 @@ def school_year():
         active_settings = ActiveSettings()
         db.session.add(active_settings)
         db.session.commit()
+        invalidate_settings()
 
     if request.method == "POST":
         old_year = active_settings.active_school_year
         active_settings.active_school_year = request.form.get(
             "school_year", "").strip()
         db.session.commit()
+        invalidate_settings()
         flash("Active school year updated successfully!", "success")
         log_action(session.get("user_name", "Admin User"),
                    f"Changed school year from '{old_year}' to '{active_settings.active_school_year}'")
@@ -314,6 +339,7 @@ def course():
         new_course = ActiveCourse(name=course_name)
         db.session.add(new_course)
         db.session.commit()
+        invalidate_catalogs()
         flash(
             f"Course '{course_name}' added to active list successfully!", "success")
         log_action(session.get("user_name", "Admin User"),
@@ -330,6 +356,7 @@ def delete_course(course_id):
     course = ActiveCourse.query.get_or_404(course_id)
     db.session.delete(course)
     db.session.commit()
+    invalidate_catalogs()
     flash(f"Course '{course.name}' removed from active list.", "info")
     log_action(session.get("user_name", "Admin User"),
                f"Deleted course '{course.name}'")
@@ -345,70 +372,69 @@ def upload_accounts():
         return redirect(url_for("admin.accounts"))
 
     try:
-        if file.filename.endswith(".csv"):
-            df = pd.read_csv(file)
-        elif file.filename.endswith((".xlsx", ".xls")):
-            df = pd.read_excel(file)
-        else:
+        df = read_accounts(file, file.filename)
+        if df is None:
             flash("Unsupported file type. Please use CSV or Excel.", "danger")
             return redirect(url_for("admin.accounts"))
 
-        df = df.fillna("")
-        uploaded_rows = []
-
-        for _, row in df.iterrows():
-            email = str(row.get("email")).strip()
-            if not email or Account.query.filter_by(email=email).first():
-                continue
-
-            first_name = str(row.get("first_name")).strip()
-            middle_name = str(row.get("middle_name")).strip()
-            last_name = str(row.get("last_name")).strip()
-            suffix = str(row.get("suffix")).strip()
-            role = str(row.get("role")).strip().capitalize() or "Student"
-            status = str(row.get("status")).strip().capitalize() or "Inactive"
-            password = generate_random_password(last_name)
-
-            acc = Account(
-                first_name=first_name,
-                middle_name=middle_name,
-                last_name=last_name,
-                suffix=suffix,
-                email=email,
-                _role=role,
-                _status=status
-            )
-            if acc.role == "Student":
-                acc.year_level = str(row.get("year_level")).strip()
-                acc.course = str(row.get("course")).strip()
-
-            acc.set_password(password)
-            db.session.add(acc)
-            uploaded_rows.append(acc.full_name)
-
-        db.session.commit()
-        if uploaded_rows:
-            flash(
-                f"Successfully uploaded {len(uploaded_rows)} accounts.", "success")
-            log_action(session.get("user_name", "Admin User"),
-                       f"Uploaded accounts: {', '.join(uploaded_rows)}")
-        else:
-            flash("No new accounts were added (all emails exist or invalid).", "info")
-
-        return redirect(url_for("admin.accounts"))
-
+        result = import_accounts(df, generate_random_password,
+                                 workers=current_app.config.get("ACCOUNT_IMPORT_WORKERS"))
     except Exception as e:
         db.session.rollback()
         flash(f"Upload failed: {str(e)}", "danger")
         return redirect(url_for("admin.accounts"))
 
+    if result.created:
+        invalidate_analytics()
+        flash(f"Successfully uploaded {len(result.created)} accounts.", "success")
+        log_action(session.get("user_name", "Admin User"),
+                   f"Uploaded {len(result.created)} accounts: {', '.join(result.created)}"[:255])
+    else:
+        flash("No new accounts were added.", "info")
+
+    session.pop("import_report", None)
+    if result.errors:
+        session["import_report"] = save_import_report(result.errors)
+        for error in result.errors[:5]:
+            flash(f"Row {error.row} ({error.email or 'no email'}): {error.message}", "warning")
+        flash(f"{len(result.errors)} row(s) were skipped. Download the error report for the full list.", "warning")
+
+    return redirect(url_for("admin.accounts"))
+
+
+IMPORT_REPORT_HEADER = ["Row", "Email", "Error"]
+
+
+def _import_report_path(token):
+    return os.path.join(current_app.instance_path, "import_reports", f"{token}.csv")
+
+
+def save_import_report(errors):
+    token = uuid.uuid4().hex
+    path = _import_report_path(token)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(IMPORT_REPORT_HEADER)
+        writer.writerows(error_report_rows(errors))
+    return token
+
+#DOWNLOAD IMPORT ERROR REPORT
+@admin_bp.route("/import_report")
+@require_role("Admin")
+def import_report():
+    token = session.get("import_report")
+    if not token or not os.path.exists(_import_report_path(token)):
+        flash("No import error report available.", "info")
+        return redirect(url_for("admin.accounts"))
+    return send_file(_import_report_path(token), mimetype="text/csv",
+                     as_attachment=True, download_name="account_import_errors.csv")
+
 #DOWNLOAD IMPORT ACCOUNT TEMPLATE
 @admin_bp.route("/download_template")
 @require_role("Admin")
 def download_template():
-    headers = ["first_name", "middle_name", "last_name", "suffix",
-               "email", "role", "status", "year_level", "course"]
-    df = pd.DataFrame(columns=headers)
+    df = pd.DataFrame(columns=IMPORT_COLUMNS)
     out = io.StringIO()
     df.to_csv(out, index=False)
     out.seek(0)
@@ -421,67 +447,42 @@ def download_template():
         download_name="account_upload_template.csv"
     )
 
-#EXPORT AS CSV
+#EXPORT ACCOUNTS
+ACCOUNT_EXPORT_HEADER = ["ID", "First_Name", "Middle_Name", "Last_Name", "Suffix", "Email",
+                         "Role", "Status", "Year_Level", "Course", "Password"]
+
+
+@export_kind("accounts")
+def accounts_export(params):
+    return ExportSpec(
+        header=ACCOUNT_EXPORT_HEADER,
+        query=Account.query.with_entities(
+            Account.id, Account.first_name, Account.middle_name, Account.last_name, Account.suffix,
+            Account.email, Account._role, Account._status, Account.year_level, Account.course,
+            Account.plain_password
+        ),
+        order=[(Account.id, "asc")],
+        key=lambda a: (a.id,),
+        format_row=tuple,
+        filename="accounts",
+        sheet_name="Accounts"
+    )
+
+
 @admin_bp.route("/export_csv")
 @require_role("Admin")
 def export_csv():
-    accounts = Account.query.all()
-    data = [{
-        "ID": a.id,
-        "First_Name": a.first_name,
-        "Middle_Name": a.middle_name,
-        "Last_Name": a.last_name,
-        "Suffix": a.suffix,
-        "Email": a.email,
-        "Role": a.role,
-        "Status": a.status,
-        "Year_Level": getattr(a, "year_level", ""),
-        "Course": getattr(a, "course", ""),
-        "Password": getattr(a, 'plain_password', 'N/A')
-    } for a in accounts]
-
-    df = pd.DataFrame(data)
-    output = io.StringIO()
-    df.to_csv(output, index=False)
-    output.seek(0)
-
     log_action(session.get("user_name", "Admin User"),
                "Exported all accounts to CSV")
-    return send_file(io.BytesIO(output.getvalue().encode()),
-                     mimetype="text/csv",
-                     as_attachment=True,
-                     download_name="accounts.csv")
+    return start_export("accounts", "csv", {})
+
 
-#EXPORT AS EXCEL
 @admin_bp.route("/export_excel")
 @require_role("Admin")
 def export_excel():
-    accounts = Account.query.all()
-    data = [{
-        "ID": a.id,
-        "First_Name": a.first_name,
-        "Middle_Name": a.middle_name,
-        "Last_Name": a.last_name,
-        "Suffix": a.suffix,
-        "Email": a.email,
-        "Role": a.role,
-        "Status": a.status,
-        "Year_Level": getattr(a, "year_level", ""),
-        "Course": getattr(a, "course", ""),
-        "Password": getattr(a, 'plain_password', 'N/A')
-    } for a in accounts]
-
-    df = pd.DataFrame(data)
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-        df.to_excel(writer, index=False, sheet_name="Accounts")
-
     log_action(session.get("user_name", "Admin User"),
                "Exported all accounts to Excel")
-    return send_file(io.BytesIO(output.getvalue()),
-                     mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                     as_attachment=True,
-                     download_name="accounts.xlsx")
+    return start_export("accounts", "excel", {})
 
 #LOGOUT
 @admin_bp.route("/logout")
@@ -0,0 +1,195 @@
+from sqlalchemy import func, distinct, extract, insert, and_, or_
+from models import db, Account, PromissoryRequest, RequestRollup
+from cache import get_version, bump_version
+from upsert import increment_row
+
+ANALYTICS_VERSION = "analytics"
+REQUEST_STATUSES = ("Pending", "Approved", "Rejected")
+ROLLUP_DIMENSIONS = ("school_year", "semester", "semester_type", "course", "status")
+ROLLUP_TERM = ("school_year", "semester", "semester_type", "course")
+
+
+#DATA VERSION
+def analytics_version():
+    """Version stamp of the data behind the analytics pages."""
+    return get_version(ANALYTICS_VERSION)
+
+
+def invalidate_analytics():
+    """Call after committing changes to requests or student accounts."""
+    bump_version(ANALYTICS_VERSION)
+
+
+#GROUPED COUNTS
+def grouped_counts(group_columns, *criteria, aggregate=None):
+    """Count rows per group in a single GROUP BY pass.
+
+    Returns a dict keyed by the group value (or a tuple of values when
+    grouping on several columns). ``aggregate`` replaces the plain
+    ``COUNT(*)``, e.g. with a ``COUNT(DISTINCT ...)``.
+    """
+    group_columns = list(group_columns)
+    aggregate = aggregate if aggregate is not None else func.count()
+    rows = db.session.query(*group_columns, aggregate) \
+        .filter(*criteria) \
+        .group_by(*group_columns) \
+        .all()
+
+    if len(group_columns) == 1:
+        return {row[0]: row[-1] for row in rows}
+    return {tuple(row[:-1]): row[-1] for row in rows}
+
+
+def status_counts(**filters):
+    """Promissory request counts per status plus a ``Total`` key.
+
+    Term-level filters are answered from the rollup table; anything
+    finer (e.g. ``student_id``) falls back to PromissoryRequest.
+    """
+    if set(filters) <= set(ROLLUP_DIMENSIONS):
+        criteria = [getattr(RequestRollup, key) == value for key, value in filters.items()]
+        rows = grouped_counts([RequestRollup.status], *criteria,
+                              aggregate=func.sum(RequestRollup.request_count))
+    else:
+        criteria = [getattr(PromissoryRequest, key) == value for key, value in filters.items()]
+        rows = grouped_counts([PromissoryRequest.status], *criteria)
+
+    counts = dict.fromkeys(REQUEST_STATUSES, 0)
+    counts.update({status: int(total) for status, total in rows.items() if status})
+    counts["Total"] = int(sum(rows.values()))
+    return counts
+
+
+def account_counts():
+    """Account counts keyed by ``(status, role)``."""
+    return grouped_counts([Account._status, Account._role])
+
+
+#PROMISSORY ANALYTICS
+def request_criteria(model=PromissoryRequest, course=None, semester=None, semester_type=None,
+                     school_year=None, status=None):
+    """Build filter criteria on PromissoryRequest (or RequestRollup), skipping empty values."""
+    criteria = []
+    if course:
+        criteria.append(model.course == course)
+    if semester:
+        criteria.append(model.semester == semester)
+    if semester_type:
+        criteria.append(model.semester_type == semester_type)
+    if school_year:
+        criteria.append(model.school_year == school_year)
+    if status:
+        criteria.append(model.status.ilike(status))
+    return criteria
+
+
+def requester_counts(**filters):
+    """Distinct requesting students per course.
+
+    Distinct counts do not add up across rollup cells, so this stays an
+    aggregate over PromissoryRequest.
+    """
+    return grouped_counts([PromissoryRequest.course], *request_criteria(**filters),
+                          aggregate=func.count(distinct(PromissoryRequest.student_id)))
+
+
+def total_requesters(**filters):
+    return db.session.query(func.count(distinct(PromissoryRequest.student_id))) \
+        .filter(*request_criteria(**filters)) \
+        .scalar() or 0
+
+
+def enrollment_counts(course=None):
+    """Student accounts per course."""
+    criteria = [Account._role == "Student"]
+    if course:
+        criteria.append(Account.course == course)
+    return grouped_counts([Account.course], *criteria)
+
+
+#ROLLUP MAINTENANCE
+def _rollup_cell(req, status=None):
+    cell = {key: getattr(req, key) for key in ROLLUP_DIMENSIONS}
+    cell["month"] = req.requested_at.month
+    if status is not None:
+        cell["status"] = status
+    return cell
+
+
+def _adjust_rollup(req, delta, status=None):
+    cell = _rollup_cell(req, status)
+    if delta > 0:
+        increment_row(db.session, RequestRollup.__table__, cell, {"request_count": delta})
+        return
+
+    RequestRollup.query.filter_by(**cell).update({
+        RequestRollup.request_count: RequestRollup.request_count + delta
+    }, synchronize_session=False)
+    RequestRollup.query.filter_by(request_count=0, **cell).delete(synchronize_session=False)
+
+
+def rollup_request_added(req):
+    """Count a new request. Call after it is flushed, before the commit."""
+    _adjust_rollup(req, 1)
+
+
+def rollup_request_removed(req):
+    """Uncount a request. Call before it is deleted, in the same transaction."""
+    _adjust_rollup(req, -1)
+
+
+def rollup_status_changed(req, old_status):
+    """Move a request between status cells after its status was updated."""
+    if old_status == req.status:
+        return
+    _adjust_rollup(req, -1, status=old_status)
+    _adjust_rollup(req, 1)
+
+
+def _terms_criterion(model, month, terms):
+    return or_(*[
+        and_(*[getattr(model, key) == value for key, value in zip(ROLLUP_TERM, term)], month == term[-1])
+        for term in terms
+    ])
+
+
+def refresh_rollup_cells(reqs):
+    """Recompute every rollup cell the given requests fall into, across all statuses.
+
+    For batch changes this costs one DELETE and one INSERT ... SELECT
+    instead of several statements per request. Call after the changes
+    are flushed, before the commit.
+    """
+    terms = {tuple(getattr(req, key) for key in ROLLUP_TERM) + (req.requested_at.month,) for req in reqs}
+    if not terms:
+        return
+    RequestRollup.query \
+        .filter(_terms_criterion(RequestRollup, RequestRollup.month, terms)) \
+        .delete(synchronize_session=False)
+    db.session.execute(rollup_backfill_statement(
+        _terms_criterion(PromissoryRequest, extract("month", PromissoryRequest.requested_at), terms)))
+
+
+def rollup_backfill_statement(*criteria):
+    """INSERT ... SELECT that fills RequestRollup from PromissoryRequest."""
+    month = extract("month", PromissoryRequest.requested_at)
+    dimensions = [getattr(PromissoryRequest, key) for key in ROLLUP_DIMENSIONS]
+    source = db.select(
+        *dimensions,
+        month,
+        func.count()
+    ).where(*criteria).group_by(*dimensions, month)
+
+    return insert(RequestRollup).from_select(
+        [*ROLLUP_DIMENSIONS, "month", "request_count"],
+        source
+    )
+
+
+def rebuild_rollup():
+    """Recompute the rollup table from PromissoryRequest. Returns the number of cells."""
+    RequestRollup.query.delete()
+    db.session.execute(rollup_backfill_statement())
+    db.session.commit()
+    invalidate_analytics()
+    return RequestRollup.query.count()
@@ -1,10 +1,18 @@
 from flask import Flask, redirect, url_for, render_template, request, flash, session
 from functools import wraps
 from datetime import datetime
-from models import db, Account, SystemLog
+from models import db, Account
 from admin_routes import admin_bp
 from finance_routes import finance_bp
 from student_routes import student_bp
+from export_routes import export_bp
+from document_routes import document_bp
+from migrations import upgrade
+from audit import init_audit_log, log_action
+from profiler import init_profiler
+from assets import init_assets
+from compression import init_compression
+from export_jobs import init_export_jobs
 import os
 from datetime import datetime, timedelta
 
@@ -14,15 +22,22 @@ app = Flask(__name__)
 
 # --- Configuration ---
 app.secret_key = "your_super_secret_key_123"
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///promissory.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///promissory.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 db.init_app(app)
+init_audit_log(app)
+init_profiler(app)
+init_assets(app)
+init_compression(app)
+init_export_jobs(app)
 
 # --- Register Blueprints ---
 app.register_blueprint(admin_bp, url_prefix="/admin")
 app.register_blueprint(finance_bp, url_prefix="/finance")
 app.register_blueprint(student_bp, url_prefix="/student")
+app.register_blueprint(export_bp, url_prefix="/exports")
+app.register_blueprint(document_bp, url_prefix="/documents")
 
 # --- Helper Functions ---
 def login_required(role=None):
@@ -39,12 +54,6 @@ def login_required(role=None):
         return wrapped
     return decorator
 
-def log_action(user_email, action):
-    """Record system log for login/logout actions."""
-    log = SystemLog(user_name=user_email, action=action, timestamp=datetime.utcnow())
-    db.session.add(log)
-    db.session.commit()
-
 # --- Route Protection ---
 @app.before_request
 def protect_admin_routes():
@@ -116,4 +125,5 @@ def finance_dashboard():
 if __name__ == "__main__":
     with app.app_context():
         db.create_all()
+        upgrade()
     app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 50001)), debug=True)
@@ -0,0 +1,79 @@
+import json
+import mimetypes
+import os
+from flask import current_app, url_for, request, send_file, abort
+from werkzeug.security import safe_join
+
+DIST_FOLDER = "dist"
+MANIFEST = "manifest.json"
+# Built file names carry a content hash, so they can be cached forever.
+ASSET_MAX_AGE = 365 * 24 * 3600
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+#MANIFEST
+def dist_dir(app=None):
+    return os.path.join((app or current_app).static_folder, DIST_FOLDER)
+
+
+def variant_key(name, width=None, fmt=None):
+    """Manifest key for a source asset or one of its image variants."""
+    key = name
+    if width:
+        key += f"@{width}w"
+    if fmt:
+        key += f".{fmt}"
+    return key
+
+
+def load_manifest(app):
+    try:
+        with open(os.path.join(dist_dir(app), MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+#TEMPLATE HELPERS
+def asset_variant(name, width=None, fmt=None):
+    """URL of a built asset variant, or None when the build did not produce it."""
+    built = current_app.extensions["assets"].get(variant_key(name, width, fmt))
+    return url_for("assets", filename=built) if built else None
+
+
+def asset_url(name, width=None):
+    """Fingerprinted URL for a static asset, falling back to the plain static file."""
+    return asset_variant(name, width) or asset_variant(name) or url_for("static", filename=name)
+
+
+#SERVING
+def serve_asset(filename):
+    """Serve build output with immutable caching, precompressed when the client accepts it."""
+    path = safe_join(dist_dir(), filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    accepted = request.accept_encodings
+    for encoding, suffix in ENCODINGS:
+        if accepted[encoding] and os.path.isfile(path + suffix):
+            response = send_file(path + suffix, mimetype=mimetype, max_age=ASSET_MAX_AGE)
+            response.headers["Content-Encoding"] = encoding
+            break
+    else:
+        response = send_file(path, mimetype=mimetype, max_age=ASSET_MAX_AGE)
+
+    response.vary.add("Accept-Encoding")
+    response.cache_control.immutable = True
+    return response
+
+
+def init_assets(app):
+    """Load the build manifest and expose asset_url/asset_variant to templates.
+
+    Without a build (python build_assets.py) every helper falls back to
+    the plain static file, so development works unchanged.
+    """
+    app.extensions["assets"] = load_manifest(app)
+    app.add_url_rule("/assets/<path:filename>", "assets", serve_asset)
+    app.jinja_env.globals.update(asset_url=asset_url, asset_variant=asset_variant)
@@ -0,0 +1,145 @@
+import atexit
+import os
+import queue
+import threading
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import insert
+from models import db, SystemLog
+
+QUEUE_SIZE = 10000
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 2.0
+
+
+#AUDIT LOG WRITER
+class AuditLogWriter:
+    """Buffers SystemLog entries in-process and writes them in batches.
+
+    A background thread drains the bounded queue every ``flush_interval``
+    seconds, or sooner once ``batch_size`` entries are waiting. Entries are
+    never dropped: when the queue is full the caller flushes it itself, and
+    whatever is left is written at interpreter shutdown.
+    """
+
+    def __init__(self, app, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.app = app
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._start_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._reset()
+        atexit.register(self.close)
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._stopping = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def _ensure_thread(self):
+        # Started lazily so each forked gunicorn worker gets its own thread.
+        if self._pid != os.getpid():
+            self._reset()
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                    self._thread.start()
+
+    def enqueue(self, entry):
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.flush()
+            self._write([entry])
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def _write(self, entries):
+        with self.app.app_context():
+            try:
+                with db.engine.begin() as conn:
+                    conn.execute(insert(SystemLog.__table__), entries)
+            except Exception:
+                self.app.logger.exception("Failed to write %d audit log entries", len(entries))
+
+    def _drain(self):
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self):
+        """Write everything currently queued, synchronously."""
+        with self._write_lock:
+            batch = self._drain()
+            while batch:
+                self._write(batch)
+                batch = self._drain()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+
+def init_audit_log(app):
+    """Enable buffered audit logging for ``app`` unless AUDIT_LOG_ASYNC is False."""
+    if not app.config.get("AUDIT_LOG_ASYNC", True):
+        return None
+    writer = AuditLogWriter(
+        app,
+        queue_size=app.config.get("AUDIT_LOG_QUEUE_SIZE", QUEUE_SIZE),
+        batch_size=app.config.get("AUDIT_LOG_BATCH_SIZE", BATCH_SIZE),
+        flush_interval=app.config.get("AUDIT_LOG_FLUSH_INTERVAL", FLUSH_INTERVAL)
+    )
+    app.extensions["audit_log"] = writer
+    return writer
+
+
+def log_action(user_name, action):
+    """Record a system log entry without adding a commit to the request."""
+    entry = {"user_name": user_name, "action": action, "timestamp": datetime.utcnow()}
+    writer = current_app.extensions.get("audit_log")
+    if writer is None:
+        db.session.add(SystemLog(**entry))
+        db.session.commit()
+        return
+    writer.enqueue(entry)
+
+
+def log_actions(user_name, actions):
+    """Record several system log entries for one user as a single batch."""
+    timestamp = datetime.utcnow()
+    entries = [{"user_name": user_name, "action": action, "timestamp": timestamp} for action in actions]
+    if not entries:
+        return
+    writer = current_app.extensions.get("audit_log")
+    if writer is None:
+        db.session.execute(insert(SystemLog.__table__), entries)
+        db.session.commit()
+        return
+    for entry in entries:
+        writer.enqueue(entry)
+
+
+def flush_audit_log():
+    writer = current_app.extensions.get("audit_log")
+    if writer is not None:
+        writer.flush()
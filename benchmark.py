@@ -0,0 +1,295 @@
+# benchmark.py
+"""Route-level benchmarks against seeded databases.
+
+    python benchmark.py --sizes 1000 50000 500000 --output bench.json
+    python benchmark.py --sizes 1000 --compare bench.json
+
+Each size gets its own SQLite file under instance/benchmarks/, seeded
+once by generate_dataset.py with a fixed seed and reused on later runs
+(--reseed forces a rebuild). Every size is measured in a fresh process
+so caches and memory figures do not leak between sizes.
+
+The export routes only queue a job and redirect, so exports are timed
+separately: each kind and format is built in-process with
+run_export_job and reported as "export:<kind>.<format>".
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = os.path.join(HERE, "instance", "benchmarks")
+
+BENCH_ROUTES = [
+    ("Finance", "/finance/dashboard"),
+    ("Finance", "/finance/promissory-notes"),
+    ("Finance", "/finance/all-promissory"),
+    ("Finance", "/finance/students-promissory"),
+    ("Admin", "/admin/logs"),
+    ("Student", "/student/dashboard"),
+    ("Student", "/student/history"),
+]
+
+# Unfiltered params, so every export covers the whole table.
+BENCH_EXPORTS = [
+    ("promissory_notes", {"search": "", "status": "All", "semester": "", "semester_type": "",
+                          "school_year": "", "course": ""}),
+    ("all_promissory", {}),
+    ("students_promissory", {"search": "", "semester": "", "semester_type": "", "course": "",
+                             "year_level": "", "school_year": ""}),
+    ("accounts", {}),
+]
+EXPORT_FORMATS = ("csv", "excel")
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+# -------------------------
+# MEASURE (runs inside the app)
+# -------------------------
+def _client(app, user):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["user_id"] = user.id
+        sess["role"] = user.role
+        sess["user_name"] = f"{user.first_name} {user.last_name}"
+    return client
+
+
+def _run_export(app, user, kind, export_format, params):
+    """Build one export synchronously; returns (elapsed ms, final job status)."""
+    import uuid
+    from models import db, ExportJob
+    from export_jobs import EXTENSIONS, run_export_job, result_path
+
+    with app.app_context():
+        job = ExportJob(id=uuid.uuid4().hex, user_id=user.id, kind=kind, export_format=export_format,
+                        params=json.dumps(params), filename=f"bench.{EXTENSIONS[export_format]}",
+                        heartbeat_at=datetime.utcnow())
+        db.session.add(job)
+        db.session.commit()
+        job_id = job.id
+
+    started = time.perf_counter()
+    run_export_job(app, job_id)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    with app.app_context():
+        job = db.session.get(ExportJob, job_id)
+        status = job.status
+        if os.path.exists(result_path(job, app)):
+            os.remove(result_path(job, app))
+        db.session.delete(job)
+        db.session.commit()
+    return elapsed, status
+
+
+def measure_routes(iterations, warmup, export_iterations):
+    from sqlalchemy import event, func
+    from app import app
+    from models import db, Account, PromissoryRequest
+
+    with app.app_context():
+        busiest_student = db.session.query(PromissoryRequest.student_id) \
+            .group_by(PromissoryRequest.student_id) \
+            .order_by(func.count().desc()).limit(1).scalar()
+        users = {
+            "Admin": Account.query.filter_by(_role="Admin").first(),
+            "Finance": Account.query.filter_by(_role="Finance").first(),
+            "Student": db.session.get(Account, busiest_student) if busiest_student else None,
+        }
+        request_count = PromissoryRequest.query.count()
+        engine = db.engine
+
+    # Only count statements issued by the request itself, not the audit log writer thread.
+    statements = []
+    main_thread = threading.get_ident()
+    event.listen(engine, "before_cursor_execute",
+                 lambda *args: threading.get_ident() == main_thread and statements.append(1))
+
+    results = {}
+    for role, url in BENCH_ROUTES:
+        user = users.get(role)
+        if user is None:
+            continue
+        client = _client(app, user)
+
+        for _ in range(warmup):
+            client.get(url).get_data()
+
+        timings, counts, status = [], [], None
+        for _ in range(iterations):
+            statements.clear()
+            started = time.perf_counter()
+            response = client.get(url)
+            response.get_data()
+            timings.append((time.perf_counter() - started) * 1000)
+            counts.append(len(statements))
+            status = response.status_code
+
+        tracemalloc.start()
+        client.get(url).get_data()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[url] = {
+            "status": status,
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(percentile(timings, 95), 2),
+            "sql_statements": max(counts),
+            "peak_memory_kb": round(peak / 1024, 1),
+        }
+        _report(url, results[url])
+
+    for kind, params in BENCH_EXPORTS:
+        for export_format in EXPORT_FORMATS:
+            timings, counts, status = [], [], None
+            for _ in range(export_iterations):
+                statements.clear()
+                elapsed, status = _run_export(app, users["Finance"], kind, export_format, params)
+                timings.append(elapsed)
+                counts.append(len(statements))
+
+            tracemalloc.start()
+            _run_export(app, users["Finance"], kind, export_format, params)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            name = f"export:{kind}.{export_format}"
+            results[name] = {
+                "status": status,
+                "p50_ms": round(statistics.median(timings), 2),
+                "p95_ms": round(percentile(timings, 95), 2),
+                "sql_statements": max(counts),
+                "peak_memory_kb": round(peak / 1024, 1),
+            }
+            _report(name, results[name])
+    return {"requests": request_count, "routes": results}
+
+
+def _report(name, stats):
+    print(f"  {name:55} p50 {stats['p50_ms']:9.2f}ms  p95 {stats['p95_ms']:9.2f}ms  "
+          f"sql {stats['sql_statements']:3}  mem {stats['peak_memory_kb']:9.1f}KB",
+          file=sys.stderr)
+
+
+# -------------------------
+# ORCHESTRATE
+# -------------------------
+def database_url(size):
+    return "sqlite:///" + os.path.join(BENCH_DIR, f"bench_{size}.db")
+
+
+def seed(size, seed_value):
+    """Seed the database for ``size`` promissory requests (approximately)."""
+    from generate_dataset import REQUESTS_PER_STUDENT
+    mean = sum(n * w for n, w in REQUESTS_PER_STUDENT.items()) / sum(REQUESTS_PER_STUDENT.values())
+    students = max(1, round(size / mean))
+    subprocess.run(
+        [sys.executable, os.path.join(HERE, "generate_dataset.py"),
+         "--reset", "--students", str(students), "--seed", str(seed_value)],
+        env={**os.environ, "DATABASE_URL": database_url(size)}, cwd=HERE, check=True,
+        stdout=subprocess.DEVNULL
+    )
+
+
+def run_size(size, args):
+    path = os.path.join(BENCH_DIR, f"bench_{size}.db")
+    if args.reseed or not os.path.exists(path):
+        print(f"Seeding {size} requests...", file=sys.stderr)
+        os.makedirs(BENCH_DIR, exist_ok=True)
+        seed(size, args.seed)
+
+    print(f"Benchmarking {size} requests", file=sys.stderr)
+    completed = subprocess.run(
+        [sys.executable, __file__, "--measure",
+         "--iterations", str(args.iterations), "--warmup", str(args.warmup),
+         "--export-iterations", str(args.export_iterations)],
+        env={**os.environ, "DATABASE_URL": database_url(size)},
+        cwd=HERE, check=True, stdout=subprocess.PIPE, text=True
+    )
+    return json.loads(completed.stdout)
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline_path} ({baseline['meta'].get('revision')}):", file=sys.stderr)
+    for size, result in current["sizes"].items():
+        previous = baseline["sizes"].get(size, {}).get("routes", {})
+        for url, stats in result["routes"].items():
+            if url not in previous:
+                continue
+            before = previous[url]
+            ratio = stats["p95_ms"] / before["p95_ms"] if before["p95_ms"] else 0
+            flag = "  <-- slower" if ratio > 1.2 else ""
+            print(f"  [{size}] {url:55} p95 {before['p95_ms']:9.2f} -> {stats['p95_ms']:9.2f}ms "
+                  f"({ratio:4.2f}x)  sql {before['sql_statements']} -> {stats['sql_statements']}{flag}",
+                  file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hot routes against seeded datasets.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 50000, 500000],
+                        help="approximate promissory request counts to seed")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--export-iterations", type=int, default=3,
+                        help="builds per export kind and format")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reseed", action="store_true", help="rebuild the seeded databases")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        json.dump(measure_routes(args.iterations, args.warmup, args.export_iterations), sys.stdout)
+        return
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "export_iterations": args.export_iterations,
+            "seed": args.seed,
+        },
+        "sizes": {str(size): run_size(size, args) for size in args.sizes},
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✔ Results written to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Build fingerprinted, precompressed static assets into static/dist.
+
+    python build_assets.py [--clean]
+
+CSS/JS bundles are concatenated and written under content-hashed names
+with .gz (and, with the brotli package, .br) copies next to them.
+Images get hashed copies plus resized and WebP variants when Pillow is
+installed; image outputs already on disk are reused. Everything is recorded in static/dist/manifest.json, which
+asset_url() reads at startup.
+"""
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+from assets import DIST_FOLDER, MANIFEST, variant_key
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+DIST = os.path.join(STATIC, DIST_FOLDER)
+
+BUNDLES = {
+    "css/layout.css": ["css/layout.css"],
+    "css/admin.css": ["css/admin.css"],
+    "css/components.css": ["css/components.css"],
+    "css/student.css": ["css/student.css"],
+    "js/layout.js": ["js/layout.js"],
+}
+IMAGE_FOLDER = "images"
+# Sidebar icons render at 30px; 64px covers high-density screens.
+ICON_WIDTHS = (64,)
+IMAGE_WIDTHS = {
+    "images/logo.png": (64, 256),
+    "images/FCPC.jpg": (480, 960),
+}
+WEBP_QUALITY = 80
+COMPRESSIBLE = (".css", ".js", ".svg", ".json")
+
+parser = argparse.ArgumentParser(description="Build fingerprinted static assets.")
+parser.add_argument("--clean", action="store_true", help="remove previous build output first")
+args = parser.parse_args()
+
+
+#HELPERS
+def fingerprinted(name, data):
+    root, ext = os.path.splitext(name)
+    return f"{root}.{hashlib.sha256(data).hexdigest()[:10]}{ext}"
+
+
+def write_output(name, data):
+    """Write ``data`` under its fingerprinted name and return that name."""
+    built = fingerprinted(name, data)
+    path = os.path.join(DIST, built)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+    if name.endswith(COMPRESSIBLE):
+        with open(path + ".gz", "wb") as f:
+            f.write(gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(path + ".br", "wb") as f:
+                f.write(brotli.compress(data))
+    return built
+
+
+def minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};,])\s*", r"\1", css).strip()
+
+
+def encode_image(image, fmt):
+    out = io.BytesIO()
+    if fmt == "webp":
+        image.save(out, "WEBP", quality=WEBP_QUALITY, method=6)
+    elif fmt == "JPEG":
+        image.convert("RGB").save(out, "JPEG", quality=85, optimize=True, progressive=True)
+    else:
+        image.save(out, fmt, optimize=True)
+    return out.getvalue()
+
+
+#BUILD
+def build_bundles(manifest):
+    for name, sources in BUNDLES.items():
+        parts = []
+        for source in sources:
+            with open(os.path.join(STATIC, source), encoding="utf-8") as f:
+                parts.append(f.read())
+        text = "\n".join(parts)
+        if name.endswith(".css"):
+            text = minify_css(text)
+        manifest[name] = write_output(name, text.encode("utf-8"))
+
+
+def write_image(name, digest, encode):
+    """Write an image output named by its source digest, skipping work already on disk."""
+    root, ext = os.path.splitext(name)
+    built = f"{root}.{digest}{ext}"
+    path = os.path.join(DIST, built)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(encode())
+    return built
+
+
+def build_images(manifest):
+    # Image outputs are keyed by the source hash so repeat builds skip re-encoding.
+    folder = os.path.join(STATIC, IMAGE_FOLDER)
+    for filename in sorted(os.listdir(folder)):
+        name = f"{IMAGE_FOLDER}/{filename}"
+        root, ext = os.path.splitext(name)
+        with open(os.path.join(folder, filename), "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data + f"q{WEBP_QUALITY}".encode()).hexdigest()[:10]
+        manifest[name] = write_image(name, digest, lambda: data)
+        if Image is None:
+            continue
+
+        with Image.open(os.path.join(folder, filename)) as image:
+            fmt = image.format
+            image.load()
+        manifest[variant_key(name, fmt="webp")] = write_image(
+            f"{root}.webp", digest, lambda: encode_image(image, "webp"))
+
+        for width in IMAGE_WIDTHS.get(name, ICON_WIDTHS):
+            if width >= image.width:
+                continue
+            resized = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+            manifest[variant_key(name, width)] = write_image(
+                f"{root}-{width}w{ext}", digest, lambda: encode_image(resized, fmt))
+            manifest[variant_key(name, width, "webp")] = write_image(
+                f"{root}-{width}w.webp", digest, lambda: encode_image(resized, "webp"))
+
+
+if args.clean:
+    shutil.rmtree(DIST, ignore_errors=True)
+
+manifest = {}
+build_bundles(manifest)
+build_images(manifest)
+
+os.makedirs(DIST, exist_ok=True)
+with open(os.path.join(DIST, MANIFEST), "w") as f:
+    json.dump(manifest, f, indent=2, sort_keys=True)
+
+print(f"✔ Built {len(manifest)} assets into {os.path.relpath(DIST)}")
+if Image is None:
+    print("! Pillow is not installed; image variants were skipped")
+if brotli is None:
+    print("! brotli is not installed; only gzip copies were written")
@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+from flask import current_app
+
+
+#VERSION STAMPS
+def _version_path(name):
+    return os.path.join(current_app.instance_path, "cache_versions", name)
+
+
+def get_version(name):
+    """Current version stamp for ``name``, shared by every worker on the host.
+
+    The stamp is the mtime of a marker file in the instance folder, so a
+    check is a single ``stat`` call rather than a database round trip.
+    """
+    try:
+        return os.stat(_version_path(name)).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def bump_version(name):
+    """Invalidate ``name`` in every process by moving its version stamp forward."""
+    path = _version_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    previous = get_version(name)
+    stamp = max(time.time_ns(), previous + 1)
+    with open(path, "a"):
+        pass
+    os.utime(path, ns=(stamp, stamp))
+
+
+#IN-PROCESS CACHE
+class VersionedCache:
+    """Process-local cache that empties itself whenever its version stamp moves.
+
+    With ``ttl`` set, entries also expire after that many seconds, which
+    bounds staleness for changes made outside the app (scripts, SQL).
+    With ``max_entries`` set, the oldest entries are dropped beyond it.
+    """
+
+    def __init__(self, name, ttl=None, max_entries=None):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        version = get_version(self.name)
+        now = time.monotonic()
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            if key in self._entries:
+                value, loaded_at = self._entries[key]
+                if self.ttl is None or now - loaded_at < self.ttl:
+                    return value
+
+        value = loader()
+        with self._lock:
+            if self._version == version:
+                self._entries.pop(key, None)
+                self._entries[key] = (value, now)
+                if self.max_entries is not None:
+                    while len(self._entries) > self.max_entries:
+                        del self._entries[next(iter(self._entries))]
+        return value
+
+    def peek(self, key):
+        """Cached value for ``key`` if it is current, else None; never loads."""
+        version = get_version(self.name)
+        now = time.monotonic()
+        with self._lock:
+            if version != self._version or key not in self._entries:
+                return None
+            value, loaded_at = self._entries[key]
+            if self.ttl is not None and now - loaded_at >= self.ttl:
+                return None
+            return value
+
+    def invalidate(self):
+        bump_version(self.name)
+        with self._lock:
+            self._entries.clear()
+            self._version = None
@@ -0,0 +1,47 @@
+from models import db, ActiveCourse, RequestRollup
+from cache import VersionedCache, get_version
+
+CATALOG_FIELDS = ("semester", "semester_type", "school_year", "course")
+
+catalog_cache = VersionedCache("catalogs")
+
+
+#FILTER OPTION CATALOGS
+def _load_request_values():
+    # The rollup holds one row per distinct term/course combination, so this
+    # reads O(groups) rows instead of scanning PromissoryRequest.
+    return {
+        field: [value for (value,) in db.session.query(getattr(RequestRollup, field)).distinct()]
+        for field in CATALOG_FIELDS
+    }
+
+
+def request_values(field):
+    """Distinct values of a PromissoryRequest column, for filter dropdowns."""
+    return list(catalog_cache.get("request_values", _load_request_values)[field])
+
+
+def active_course_names():
+    return list(catalog_cache.get("active_courses", lambda: [
+        c.name for c in ActiveCourse.query.order_by(ActiveCourse.name).all()
+    ]))
+
+
+def note_request_values(req):
+    """Invalidate the catalogs if ``req`` may have introduced a value they do not list yet.
+
+    Only this worker's current snapshot is consulted. Reloading here would
+    already include ``req`` and hide the change from every other worker,
+    so without a snapshot the catalogs are invalidated unconditionally.
+    """
+    values = catalog_cache.peek("request_values")
+    if values is None or any(getattr(req, field) not in values[field] for field in CATALOG_FIELDS):
+        catalog_cache.invalidate()
+
+
+def catalog_version():
+    return get_version(catalog_cache.name)
+
+
+def invalidate_catalogs():
+    catalog_cache.invalidate()
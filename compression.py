@@ -0,0 +1,58 @@
+import gzip
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIMETYPES = ("text/html", "application/json", "text/css", "application/javascript")
+COMPRESS_MIN_SIZE = 500
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress_response(response):
+    """Compress buffered text responses with the best encoding the client accepts."""
+    if response.mimetype not in COMPRESS_MIMETYPES:
+        return response
+    response.vary.add("Accept-Encoding")
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or "Content-Encoding" in response.headers):
+        return response
+
+    data = response.get_data()
+    encoding = _encoding()
+    if encoding is None or len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    if encoding == "br":
+        body = brotli.compress(data, quality=BROTLI_QUALITY)
+    else:
+        body = gzip.compress(data, compresslevel=GZIP_LEVEL)
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    etag, _ = response.get_etag()
+    if etag:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    """Negotiate gzip/brotli for rendered pages and JSON (COMPRESS_RESPONSES, default on).
+
+    Files from send_file are passed through untouched; built assets are
+    precompressed by build_assets.py instead.
+    """
+    if app.config.get("COMPRESS_RESPONSES", True):
+        app.after_request(compress_response)
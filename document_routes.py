@@ -0,0 +1,88 @@
+import mimetypes
+from flask import Blueprint, redirect, url_for, flash, session, send_file, abort, request, current_app, Response
+from functools import wraps
+from sqlalchemy import or_
+from models import db, DocumentBlob, PromissoryRequest
+from uploads import blob_path, is_blob_id
+
+document_bp = Blueprint("documents", __name__, url_prefix="/documents")
+
+REVIEWER_ROLES = ("Admin", "Finance")
+# Blob ids are content hashes, so a given URL never changes content.
+DOCUMENT_MAX_AGE = 365 * 24 * 3600
+# Only these render inline; anything else (HTML, SVG, ...) is forced to download,
+# since the stored content type comes from the uploading browser.
+INLINE_TYPES = {"application/pdf", "image/png", "image/jpeg", "image/gif", "image/webp"}
+
+
+#UTILITY FUNCTION
+def require_login(func):
+    @wraps(func)
+    def decorated_function(*args, **kwargs):
+        if "user_id" not in session:
+            flash("Please log in first.", "warning")
+            return redirect(url_for("login"))
+        return func(*args, **kwargs)
+    return decorated_function
+
+
+def can_view(blob_id):
+    """Reviewers see every document; students only those on their own requests."""
+    if session.get("role") in REVIEWER_ROLES:
+        return True
+    return db.session.query(PromissoryRequest.id).filter(
+        PromissoryRequest.student_id == session["user_id"],
+        or_(PromissoryRequest.reason_doc == blob_id, PromissoryRequest.valid_id == blob_id)
+    ).first() is not None
+
+
+def _cache_headers(response, blob):
+    # Strong validator: the id is the SHA-256 of the bytes.
+    response.set_etag(blob.id)
+    response.cache_control.no_cache = None
+    response.cache_control.public = None
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    response.cache_control.max_age = current_app.config.get("DOCUMENT_MAX_AGE", DOCUMENT_MAX_AGE)
+    response.headers.pop("Expires", None)
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    return response
+
+
+def _accel_response(blob, prefix, mimetype, download_name, as_attachment):
+    """Hand the transfer (including ranges) to nginx via X-Accel-Redirect."""
+    response = Response(mimetype=mimetype)
+    response.headers["X-Accel-Redirect"] = f"{prefix.rstrip('/')}/{blob.id[:2]}/{blob.id}"
+    response.headers.set("Content-Disposition", "attachment" if as_attachment else "inline",
+                         filename=download_name)
+    return response
+
+
+#VIEW DOCUMENT
+@document_bp.route("/<blob_id>")
+@require_login
+def view(blob_id):
+    """Serve a document with strong ETags, byte ranges and private caching.
+
+    Set DOCUMENT_ACCEL_PREFIX to the internal nginx location that maps
+    to instance/documents to offload the transfer, or Flask's
+    USE_X_SENDFILE for servers that understand X-Sendfile.
+    """
+    blob = db.session.get(DocumentBlob, blob_id) if is_blob_id(blob_id) else None
+    if blob is None or blob.ref_count <= 0 or not can_view(blob_id):
+        abort(404)
+
+    # Answer revalidations before touching the file.
+    if blob.id in request.if_none_match:
+        return _cache_headers(Response(status=304), blob)
+
+    mimetype = blob.content_type or "application/octet-stream"
+    download_name = f"document-{blob.id[:12]}{mimetypes.guess_extension(blob.content_type or '') or ''}"
+    as_attachment = mimetype not in INLINE_TYPES
+    accel_prefix = current_app.config.get("DOCUMENT_ACCEL_PREFIX")
+    if accel_prefix:
+        return _cache_headers(_accel_response(blob, accel_prefix, mimetype, download_name, as_attachment), blob)
+
+    response = send_file(blob_path(blob.id), mimetype=mimetype, download_name=download_name,
+                         as_attachment=as_attachment, etag=blob.id, conditional=True)
+    return _cache_headers(response, blob)
@@ -0,0 +1,220 @@
+import json
+import os
+import threading
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app, session, redirect, url_for
+from sqlalchemy import func, update
+from sqlalchemy.exc import SQLAlchemyError
+from models import db, ExportJob
+from exports import iter_csv, write_xlsx
+from pagination import iter_keyset, iter_ordered
+
+EXPORT_WORKERS = 2
+EXPORT_TTL = timedelta(hours=24)
+READ_CHUNK = 2000
+PROGRESS_EVERY = 5000
+# A Queued/Running job whose heartbeat is older than this was lost with its worker.
+EXPORT_STALE_AFTER = timedelta(minutes=15)
+INTERRUPTED_ERROR = "Interrupted by a server restart. Please start the export again."
+EXTENSIONS = {"csv": "csv", "excel": "xlsx"}
+
+# key=None streams the query once (iter_ordered) instead of seeking chunk by chunk.
+ExportSpec = namedtuple("ExportSpec", "header query order key format_row filename sheet_name")
+
+EXPORT_KINDS = {}
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def export_kind(name):
+    """Register ``build(params) -> ExportSpec`` as the export called ``name``."""
+    def register(build):
+        EXPORT_KINDS[name] = build
+        return build
+    return register
+
+
+#EXECUTOR
+def _get_executor(app):
+    # One pool per worker process; a forked gunicorn worker builds its own.
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=app.config.get("EXPORT_WORKERS", EXPORT_WORKERS),
+                thread_name_prefix="export-job"
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def export_dir(app=None):
+    return os.path.join((app or current_app).instance_path, "exports")
+
+
+def result_path(job, app=None):
+    return os.path.join(export_dir(app), f"{job.id}.{EXTENSIONS[job.export_format]}")
+
+
+#JOBS
+def submit_export(kind, export_format, params, user_id):
+    """Record an export job and hand it to the background pool. Returns the job."""
+    purge_expired_exports()
+    base_name = EXPORT_KINDS[kind](params).filename
+    job = ExportJob(
+        id=uuid.uuid4().hex,
+        user_id=user_id,
+        kind=kind,
+        export_format=export_format,
+        params=json.dumps(params),
+        filename=f"{base_name}.{EXTENSIONS[export_format]}",
+        heartbeat_at=datetime.utcnow()
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    app = current_app._get_current_object()
+    _get_executor(app).submit(run_export_job, app, job.id)
+    return job
+
+
+def start_export(kind, export_format, params):
+    """Queue an export for the signed-in user and send them to its job page."""
+    job = submit_export(kind, export_format, params, session["user_id"])
+    return redirect(url_for("exports.job_page", job_id=job.id))
+
+
+def _set_progress(job_id, **values):
+    """Record job progress on a connection of its own.
+
+    The job's session may be streaming rows; pymysql would drain that
+    result if the same connection ran another statement.
+    """
+    values["heartbeat_at"] = datetime.utcnow()
+    table = ExportJob.__table__
+    with db.engine.begin() as conn:
+        conn.execute(update(table).where(table.c.id == job_id).values(values))
+
+
+def run_export_job(app, job_id):
+    """Build the export file for ``job_id``; runs on a pool thread."""
+    with app.app_context():
+        try:
+            job = db.session.get(ExportJob, job_id)
+            if job is None or job.status != "Queued":
+                return
+            spec = EXPORT_KINDS[job.kind](json.loads(job.params))
+            export_format, path = job.export_format, result_path(job, app)
+            _set_progress(job_id, status="Running", total=spec.query.order_by(None).count())
+
+            def rows():
+                # A streamed read keeps its statement open, and SQLite cannot
+                # commit another write until it ends, so only keyset reads
+                # report progress along the way.
+                streamed = spec.key is None
+                if streamed:
+                    source = iter_ordered(spec.query, spec.order, READ_CHUNK)
+                else:
+                    source = iter_keyset(spec.query, spec.order, spec.key, READ_CHUNK)
+                for count, row in enumerate(source, 1):
+                    yield spec.format_row(row)
+                    if not streamed and count % PROGRESS_EVERY == 0:
+                        _set_progress(job_id, progress=count)
+
+            os.makedirs(export_dir(app), exist_ok=True)
+            partial = path + ".part"
+            if export_format == "csv":
+                with open(partial, "w", newline="", encoding="utf-8") as f:
+                    for chunk in iter_csv(spec.header, rows()):
+                        f.write(chunk)
+            else:
+                write_xlsx(partial, spec.header, rows(), spec.sheet_name)
+            os.replace(partial, path)
+
+            finished = datetime.utcnow()
+            _set_progress(job_id, status="Done", progress=ExportJob.__table__.c.total, finished_at=finished,
+                          expires_at=finished + app.config.get("EXPORT_TTL", EXPORT_TTL))
+        except Exception as e:
+            db.session.rollback()
+            app.logger.exception("Export job %s failed", job_id)
+            try:
+                _set_progress(job_id, status="Failed", error=str(e)[:255], finished_at=datetime.utcnow())
+            except Exception:
+                # Left Running; fail_stale_exports picks it up once the heartbeat is stale.
+                app.logger.exception("Could not mark export job %s as failed", job_id)
+        finally:
+            db.session.remove()
+
+
+def fail_stale_exports(app=None):
+    """Mark Queued/Running jobs with no heartbeat for EXPORT_STALE_AFTER as Failed.
+
+    The pool lives inside a web worker, so its jobs die with it; without
+    this their status pages would poll forever. Returns the number failed.
+    """
+    cutoff = datetime.utcnow() - (app or current_app).config.get("EXPORT_STALE_AFTER", EXPORT_STALE_AFTER)
+    now = datetime.utcnow()
+    failed = ExportJob.query.filter(
+        ExportJob.status.in_(["Queued", "Running"]),
+        func.coalesce(ExportJob.heartbeat_at, ExportJob.created_at) < cutoff
+    ).update({"status": "Failed", "error": INTERRUPTED_ERROR, "finished_at": now, "heartbeat_at": now},
+             synchronize_session=False)
+    db.session.commit()
+    return failed
+
+
+def init_export_jobs(app):
+    """Fail jobs orphaned by a previous worker when the app starts."""
+    with app.app_context():
+        try:
+            failed = fail_stale_exports(app)
+        except SQLAlchemyError:
+            # Tables not migrated yet; the status API sweeps again later.
+            db.session.rollback()
+            app.logger.info("Skipped export job recovery; export tables are not migrated yet")
+            return
+        finally:
+            db.session.remove()
+        if failed:
+            app.logger.warning("Marked %d interrupted export job(s) as Failed", failed)
+
+
+def purge_expired_exports():
+    """Delete result files past their expiry and mark their jobs Expired."""
+    expired = ExportJob.query.filter(ExportJob.status == "Done",
+                                     ExportJob.expires_at < datetime.utcnow()).all()
+    for job in expired:
+        try:
+            os.remove(result_path(job))
+        except FileNotFoundError:
+            pass
+        job.status = "Expired"
+    if expired:
+        db.session.commit()
+
+
+def job_status(job):
+    """JSON-ready view of a job for the status API."""
+    percent = None
+    if job.total:
+        percent = round(100 * min(job.progress, job.total) / job.total, 1)
+    elif job.status == "Done":
+        percent = 100.0
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "format": job.export_format,
+        "status": job.status,
+        "progress": job.progress,
+        "total": job.total,
+        "percent": percent,
+        "filename": job.filename,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "expires_at": job.expires_at.isoformat() if job.expires_at else None,
+    }
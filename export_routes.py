@@ -0,0 +1,67 @@
+import os
+from datetime import datetime
+from flask import Blueprint, current_app, render_template, redirect, url_for, flash, session, jsonify, send_file, abort
+from functools import wraps
+from models import db, ExportJob
+from export_jobs import job_status, result_path, fail_stale_exports, EXPORT_TTL
+from exports import XLSX_MIMETYPE
+
+export_bp = Blueprint("exports", __name__, url_prefix="/exports", template_folder="templates")
+
+DASHBOARDS = {"Admin": "admin.dashboard", "Finance": "finance.dashboard"}
+
+
+#UTILITY FUNCTION
+def require_login(func):
+    @wraps(func)
+    def decorated_function(*args, **kwargs):
+        if "user_id" not in session:
+            flash("Please log in first.", "warning")
+            return redirect(url_for("login"))
+        return func(*args, **kwargs)
+    return decorated_function
+
+
+def get_own_job(job_id):
+    """The job if it belongs to the signed-in user, else 404."""
+    job = ExportJob.query.filter_by(id=job_id, user_id=session["user_id"]).first()
+    if job is None:
+        abort(404)
+    return job
+
+
+#JOB PAGE
+@export_bp.route("/<job_id>")
+@require_login
+def job_page(job_id):
+    job = get_own_job(job_id)
+    ttl = current_app.config.get("EXPORT_TTL", EXPORT_TTL)
+    return render_template("export_job.html", job=job, ttl_hours=int(ttl.total_seconds() // 3600),
+                           back_url=url_for(DASHBOARDS.get(session.get("role"), "login")))
+
+
+#JOB STATUS API
+@export_bp.route("/<job_id>/status")
+@require_login
+def status(job_id):
+    job = get_own_job(job_id)
+    if job.status in ("Queued", "Running") and fail_stale_exports():
+        db.session.refresh(job)
+    data = job_status(job)
+    if job.status == "Done":
+        data["download_url"] = url_for("exports.download", job_id=job.id)
+    return jsonify(data)
+
+
+#DOWNLOAD
+@export_bp.route("/<job_id>/download")
+@require_login
+def download(job_id):
+    job = get_own_job(job_id)
+    path = result_path(job)
+    if job.status != "Done" or (job.expires_at and job.expires_at < datetime.utcnow()) \
+            or not os.path.exists(path):
+        flash("This export is not available. It may still be running or has expired.", "warning")
+        return redirect(url_for("exports.job_page", job_id=job.id))
+    mimetype = "text/csv" if job.export_format == "csv" else XLSX_MIMETYPE
+    return send_file(path, mimetype=mimetype, as_attachment=True, download_name=job.filename)
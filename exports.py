@@ -0,0 +1,43 @@
+import csv
+import io
+import tempfile
+import xlsxwriter
+
+CHUNK_SIZE = 1000
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+#FILE WRITERS
+def iter_csv(header, rows, chunk_size=CHUNK_SIZE):
+    """Encode rows as CSV text, yielding one chunk per ``chunk_size`` rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    yield buffer.getvalue()
+
+
+def write_xlsx(fileobj, header, rows, sheet_name):
+    """Write rows to an XLSX workbook in xlsxwriter's constant-memory mode.
+
+    Each row is flushed to a temp file as soon as it is written, so only
+    the current row is held in memory.
+    """
+    workbook = xlsxwriter.Workbook(fileobj, {
+        "constant_memory": True,
+        "tmpdir": tempfile.gettempdir()
+    })
+    worksheet = workbook.add_worksheet(sheet_name)
+    worksheet.write_row(0, 0, header, workbook.add_format({"bold": True, "border": 1}))
+
+    for row_number, row in enumerate(rows, 1):
+        worksheet.write_row(row_number, 0, row)
+
+    workbook.close()
@@ -1,14 +1,20 @@
-from flask import Blueprint, render_template, redirect, url_for, request, send_file, flash, session, Response
-import pandas as pd
-import io
-import csv
-from models import db, Account, PromissoryRequest, ActiveSettings, ActiveCourse, SystemLog
+from flask import Blueprint, render_template, redirect, url_for, request, flash, session, jsonify
+from models import db, Account, PromissoryRequest
+from export_jobs import ExportSpec, export_kind, start_export
+from catalogs import request_values, active_course_names, catalog_version
+from fragments import cached_fragment
+from student_summary import invalidate_student_summary
+from pagination import keyset_paginate
+from search import account_search_criterion
+from audit import log_action, log_actions
+from settings import get_active_settings
+from analytics import (status_counts, request_criteria, requester_counts,
+                       total_requesters, enrollment_counts, rollup_status_changed, refresh_rollup_cells,
+                       analytics_version, invalidate_analytics)
 from functools import wraps
 from datetime import datetime
-from sqlalchemy.orm import joinedload
-from sqlalchemy import func
-from collections import defaultdict
-import calendar
+from sqlalchemy.orm import joinedload, contains_eager
+from sqlalchemy import func, update
 import json
 
 finance_bp = Blueprint("finance", __name__,
@@ -35,20 +41,6 @@ def get_full_name(acc):
     return " ".join(filter(None, [acc.first_name, acc.middle_name, acc.last_name, acc.suffix]))
 
 
-def get_active_settings():
-    settings = ActiveSettings.query.first()
-    return (
-        settings.active_semester if settings else "Not Set",
-        settings.active_school_year if settings else "Not Set"
-    )
-
-
-def log_action(user_name, action):
-    log = SystemLog(user_name=user_name, action=action)
-    db.session.add(log)
-    db.session.commit()
-
-
 #DASHBOARD
 @finance_bp.route("/dashboard")
 @require_role("Finance")
@@ -56,20 +48,21 @@ def dashboard():
     user_name = session.get("user_name", "Finance User")
     active_semester, active_school_year = get_active_settings()
 
-    base_query = PromissoryRequest.query.filter_by(
-        semester=active_semester,
-        school_year=active_school_year
-    )
+    counts = status_counts(semester=active_semester, school_year=active_school_year)
 
     data = {
-        "total_promissory": base_query.count(),
-        "total_pending": base_query.filter_by(status="Pending").count(),
-        "total_approved": base_query.filter_by(status="Approved").count(),
-        "total_rejected": base_query.filter_by(status="Rejected").count(),
+        "total_promissory": counts["Total"],
+        "total_pending": counts["Pending"],
+        "total_approved": counts["Approved"],
+        "total_rejected": counts["Rejected"],
     }
 
-    recent_requests = base_query.join(Account, PromissoryRequest.student_id == Account.id) \
-        .filter(PromissoryRequest.status == "Pending") \
+    recent_requests = PromissoryRequest.query.filter_by(
+        semester=active_semester,
+        school_year=active_school_year,
+        status="Pending"
+    ).join(Account, PromissoryRequest.student_id == Account.id) \
+        .options(contains_eager(PromissoryRequest.student)) \
         .order_by(PromissoryRequest.requested_at.desc()) \
         .limit(5).all()
 
@@ -95,17 +88,37 @@ def dashboard():
 
 
 #PROMISSORY LIST
+def promissory_notes_query(search, status, semester, semester_type, school_year, course):
+    query = PromissoryRequest.query.join(
+        Account, PromissoryRequest.student_id == Account.id
+    )
+
+    if search:
+        query = query.filter(account_search_criterion(search))
+
+    if status != "All":
+        query = query.filter(PromissoryRequest.status == status)
+    if semester:
+        query = query.filter(PromissoryRequest.semester == semester)
+    if semester_type:
+        query = query.filter(PromissoryRequest.semester_type == semester_type)
+    if school_year:
+        query = query.filter(PromissoryRequest.school_year == school_year)
+    if course:
+        query = query.filter(PromissoryRequest.course == course)
+    return query
+
+
 @finance_bp.route("/promissory-notes")
 @require_role("Finance")
 def promissory_notes():
     user_name = session.get("user_name", "Finance User")
     active_semester, active_school_year = get_active_settings()
 
-    all_courses = [c.name for c in ActiveCourse.query.order_by(ActiveCourse.name).all()]
-    all_semesters = [s[0] for s in db.session.query(PromissoryRequest.semester).distinct()]
-    all_semester_types = [s[0] for s in db.session.query(PromissoryRequest.semester_type).distinct()]
-    all_school_years = [s[0] for s in db.session.query(
-        PromissoryRequest.school_year).distinct().order_by(PromissoryRequest.school_year.desc())]
+    all_courses = active_course_names()
+    all_semesters = request_values("semester")
+    all_semester_types = request_values("semester_type")
+    all_school_years = sorted(request_values("school_year"), key=lambda x: x or "", reverse=True)
 
     search = request.args.get("search", "").strip()
     status_filter = request.args.get("status", "Pending").capitalize()
@@ -114,35 +127,18 @@ def promissory_notes():
     school_year_filter = request.args.get("school_year", active_school_year)
     course_filter = request.args.get("course", "")
     export_format = request.args.get("export")
-    page = request.args.get("page", 1, type=int)
+    cursor = request.args.get("cursor")
     per_page = 8
 
-    query = PromissoryRequest.query.join(
-        Account, PromissoryRequest.student_id == Account.id
+    filters = dict(
+        search=search,
+        status=status_filter,
+        semester=semester_filter,
+        semester_type=semester_type_filter,
+        school_year=school_year_filter,
+        course=course_filter
     )
-
-    if search:
-        term = f"%{search}%"
-        query = query.filter(
-            func.concat(Account.first_name, ' ', Account.last_name).ilike(term) |
-            (Account.first_name.ilike(term)) |
-            (Account.last_name.ilike(term))
-        )
-
-    if status_filter != "All":
-        query = query.filter(PromissoryRequest.status == status_filter)
-    if semester_filter:
-        query = query.filter(PromissoryRequest.semester == semester_filter)
-    if semester_type_filter:
-        query = query.filter(PromissoryRequest.semester_type == semester_type_filter)
-    if school_year_filter:
-        query = query.filter(PromissoryRequest.school_year == school_year_filter)
-    if course_filter:
-        query = query.filter(PromissoryRequest.course == course_filter)
-
-    results = query.options(joinedload(PromissoryRequest.student)) \
-                   .order_by(PromissoryRequest.requested_at.desc()) \
-                   .all()
+    query = promissory_notes_query(**filters)
 
     if export_format in ["csv", "excel"]:
         log_action(
@@ -150,11 +146,15 @@ def promissory_notes():
             f"Exported promissory requests ({export_format.upper()}) "
             f"with filters: status={status_filter}, semester={semester_filter}, course={course_filter}"
         )
-        return export_promissory_requests(results, export_format)
-
-    pagination = query.options(joinedload(PromissoryRequest.student)) \
-                      .order_by(PromissoryRequest.requested_at.desc()) \
-                      .paginate(page=page, per_page=per_page, error_out=False)
+        return start_export("promissory_notes", export_format, filters)
+
+    pagination = keyset_paginate(
+        query.options(joinedload(PromissoryRequest.student)),
+        order=[(PromissoryRequest.requested_at, "desc"), (PromissoryRequest.id, "desc")],
+        key=lambda r: (r.requested_at, r.id),
+        cursor=cursor,
+        per_page=per_page
+    )
 
     return render_template(
         "finance/promissory_notes.html",
@@ -173,45 +173,73 @@ def promissory_notes():
         active_semester=active_semester,
         active_school_year=active_school_year,
         pagination=pagination,
-        total_pages=pagination.pages
+        total_pages=pagination.pages_label
     )
 
 
 #EXPORT PROMISSORY
-def export_promissory_requests(results, export_format):
-    data = [{
-        "Student Name": f"{r.student.first_name} {r.student.middle_name or ''} {r.student.last_name} {r.student.suffix or ''}",
-        "Course": r.course,
-        "Year Level": r.year_level,
-        "Semester": r.semester,
-        "Semester Type": r.semester_type,
-        "Status": r.status
-    } for r in results]
-
-    if export_format == "csv":
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=data[0].keys())
-        writer.writeheader()
-        writer.writerows(data)
-        output.seek(0)
-        return send_file(io.BytesIO(output.getvalue().encode()), mimetype="text/csv",
-                         as_attachment=True, download_name="promissory_requests.csv")
-
-    elif export_format == "excel":
-        df = pd.DataFrame(data)
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            df.to_excel(writer, index=False, sheet_name='Promissory Requests')
-        output.seek(0)
-        return send_file(
-            output,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            as_attachment=True,
-            download_name="promissory_requests.xlsx"
-        )
+PROMISSORY_EXPORT_HEADER = ["Student Name", "Course", "Year Level", "Semester", "Semester Type", "Status"]
+
+
+@export_kind("promissory_notes")
+def promissory_notes_export(params):
+    query = promissory_notes_query(**params).with_entities(
+        Account.first_name, Account.middle_name, Account.last_name, Account.suffix,
+        PromissoryRequest.course, PromissoryRequest.year_level, PromissoryRequest.semester,
+        PromissoryRequest.semester_type, PromissoryRequest.status,
+        PromissoryRequest.requested_at, PromissoryRequest.id
+    )
+    return ExportSpec(
+        header=PROMISSORY_EXPORT_HEADER,
+        query=query,
+        order=[(PromissoryRequest.requested_at, "desc"), (PromissoryRequest.id, "desc")],
+        key=lambda r: (r.requested_at, r.id),
+        format_row=lambda r: (
+            f"{r.first_name} {r.middle_name or ''} {r.last_name} {r.suffix or ''}",
+            r.course,
+            r.year_level,
+            r.semester,
+            r.semester_type,
+            r.status
+        ),
+        filename="promissory_requests",
+        sheet_name="Promissory Requests"
+    )
 
 
 #ALL PROMISSORY ANALYTICS
+ALL_PROMISSORY_EXPORT_HEADER = ["Student Name", "Course", "Semester", "Semester Type", "School Year",
+                                "Date Submitted", "Status"]
+
+
+@export_kind("all_promissory")
+def all_promissory_export(params):
+    query = PromissoryRequest.query.join(
+        Account, PromissoryRequest.student_id == Account.id
+    ).filter(*request_criteria(**params)).with_entities(
+        Account.first_name, Account.last_name, PromissoryRequest.course, PromissoryRequest.semester,
+        PromissoryRequest.semester_type, PromissoryRequest.school_year, PromissoryRequest.requested_at,
+        PromissoryRequest.status, PromissoryRequest.id
+    )
+    return ExportSpec(
+        header=ALL_PROMISSORY_EXPORT_HEADER,
+        query=query,
+        order=[(PromissoryRequest.id, "asc")],
+        key=lambda r: (r.id,),
+        format_row=lambda r: (
+            f"{r.first_name or ''} {r.last_name or ''}".strip() or "N/A",
+            r.course,
+            r.semester,
+            r.semester_type,
+            r.school_year,
+            r.requested_at.strftime("%b %d, %Y"),
+            r.status
+        ),
+        filename="promissory_requests",
+        sheet_name="Promissory Requests"
+    )
+
+
 @finance_bp.route("/all-promissory")
 @require_role("Finance")
 def all_promissory():
@@ -228,251 +256,201 @@ def all_promissory():
     if school_year_filter.lower() == "all":
         school_year_filter = None
 
-    all_students_query = Account.query.filter(Account._role == "Student")
-    if course_filter:
-        all_students_query = all_students_query.filter(Account.course == course_filter)
-
-    all_students = all_students_query.all()
-    total_students = len(all_students)
-
-    requests_query = PromissoryRequest.query.join(
-        Account, PromissoryRequest.student_id == Account.id
+    filters = dict(
+        course=course_filter,
+        semester=semester_filter,
+        semester_type=semester_type_filter,
+        school_year=school_year_filter,
+        status=status_filter if status_filter != "all" else None
     )
 
-    if course_filter:
-        requests_query = requests_query.filter(PromissoryRequest.course == course_filter)
-    if semester_filter:
-        requests_query = requests_query.filter(PromissoryRequest.semester == semester_filter)
-    if semester_type_filter:
-        requests_query = requests_query.filter(PromissoryRequest.semester_type == semester_type_filter)
-    if school_year_filter:
-        requests_query = requests_query.filter(PromissoryRequest.school_year == school_year_filter)
-    if status_filter != "all":
-        requests_query = requests_query.filter(PromissoryRequest.status.ilike(status_filter))
-
-    promissory_requests = requests_query.options(joinedload(PromissoryRequest.student)).all()
-
     export_format = request.args.get("export")
     if export_format in ("csv", "excel"):
-        data = []
-        for r in promissory_requests:
-            student_name = f"{getattr(r.student, 'first_name', '')} {getattr(r.student, 'last_name', '')}".strip() or "N/A"
-            data.append({
-                "Student Name": student_name,
-                "Course": r.course,
-                "Semester": r.semester,
-                "Semester Type": r.semester_type,
-                "School Year": r.school_year,
-                "Date Submitted": r.requested_at.strftime("%b %d, %Y"),
-                "Status": r.status
-            })
-
-        df = pd.DataFrame(data)
-        output = io.BytesIO()
-
-        if export_format == "csv":
-            return Response(
-                df.to_csv(index=False),
-                mimetype="text/csv",
-                headers={"Content-Disposition": "attachment; filename=promissory_requests.csv"}
-            )
-        else:
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                df.to_excel(writer, index=False, sheet_name='Promissory Requests')
-            output.seek(0)
-            return Response(
-                output,
-                mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                headers={"Content-Disposition": "attachment; filename=promissory_requests.xlsx"}
-            )
-
-    unique_student_ids = {r.student_id for r in promissory_requests}
-    total_requested = len(unique_student_ids)
-    selected_status = status_filter
-
-    courses = [c[0] for c in db.session.query(PromissoryRequest.course).distinct()]
-    semesters = [s[0] for s in db.session.query(PromissoryRequest.semester).distinct()]
-    semester_types = [s[0] for s in db.session.query(PromissoryRequest.semester_type).distinct()]
-    school_years = sorted(
-        [y[0] for y in db.session.query(PromissoryRequest.school_year).distinct()],
-        key=lambda x: int(x.split('-')[0])
+        return start_export("all_promissory", export_format, filters)
+
+    filter_values = dict(
+        course=course_filter or "",
+        semester=semester_filter or "",
+        semester_type=semester_type_filter or "",
+        school_year=school_year_filter or "",
+        status=status_filter
     )
+    filters_html = cached_fragment(
+        "all_promissory_filters", filter_values, catalog_version(),
+        lambda: render_template(
+            "finance/_all_promissory_filters.html",
+            courses=request_values("course"),
+            semesters=request_values("semester"),
+            semester_types=request_values("semester_type"),
+            school_years=sorted(request_values("school_year"), key=lambda x: int(x.split('-')[0])),
+            selected_course=filter_values["course"],
+            selected_semester=filter_values["semester"],
+            selected_semester_type=filter_values["semester_type"],
+            selected_school_year=filter_values["school_year"],
+            selected_status=status_filter
+        ))
+    analytics_html = cached_fragment(
+        "all_promissory_analytics", filters, analytics_version(),
+        lambda: render_template("finance/_all_promissory_analytics.html", **all_promissory_analytics(filters)))
 
-    monthly_course_counts = defaultdict(lambda: [0]*12)
-    course_student_counts = defaultdict(set)
-
-    for r in promissory_requests:
-        idx = r.requested_at.month - 1
-        monthly_course_counts[r.course][idx] += 1
-        course_student_counts[r.course].add(r.student_id)
+    return render_template(
+        "finance/all_promissory.html",
+        finance_user=session.get("user_name", "Finance User"),
+        selected_course=filter_values["course"],
+        selected_semester=filter_values["semester"],
+        selected_semester_type=filter_values["semester_type"],
+        selected_school_year=filter_values["school_year"],
+        selected_status=status_filter,
+        active_semester=active_semester,
+        active_school_year=active_school_year,
+        filters_html=filters_html,
+        analytics_html=analytics_html
+    )
 
-    top_course = max(monthly_course_counts.items(), key=lambda x: sum(x[1]))[0] if monthly_course_counts else "N/A"
-    months = [calendar.month_abbr[i+1] for i in range(12)]
-    top_course_monthly = monthly_course_counts.get(top_course, [0]*12)
 
-    courses_sorted = [c for c, _ in sorted(
-        ((course, len(students)) for course, students in course_student_counts.items()),
-        key=lambda x: x[1]
-    )]
+def all_promissory_analytics(filters):
+    """Figures for the statistics cards and charts."""
+    enrollment = enrollment_counts(filters["course"])
+    course_student_counts = requester_counts(**filters)
 
-    counts_sorted = [len(course_student_counts[c]) for c in courses_sorted]
-    totals_sorted = [sum(1 for s in all_students if s.course == c) for c in courses_sorted]
+    courses_sorted = [c for c, _ in sorted(course_student_counts.items(), key=lambda x: x[1])]
+    counts_sorted = [course_student_counts[c] for c in courses_sorted]
+    totals_sorted = [enrollment.get(c, 0) for c in courses_sorted]
 
     percentages_sorted = [
         round((counts_sorted[i] / totals_sorted[i]) * 100, 2) if totals_sorted[i] else 0
         for i in range(len(courses_sorted))
     ]
 
-    sorted_percentages = sorted(
-        zip(courses_sorted, percentages_sorted), key=lambda x: x[1], reverse=True
-    )
-
-    if sorted_percentages:
-        percentage_courses_sorted, percentages_sorted_desc = zip(*sorted_percentages)
-    else:
-        percentage_courses_sorted, percentages_sorted_desc = [], []
-
-    bar_data = {
-        "labels": ["Total Students", "Requested Promissory"],
-        "values": [total_students, total_requested]
-    }
-
-    return render_template(
-        "finance/all_promissory.html",
-        finance_user=session.get("user_name", "Finance User"),
-        courses=courses,
-        semesters=semesters,
-        semester_types=semester_types,
-        school_years=school_years,
-        selected_course=course_filter or "",
-        selected_semester=semester_filter or "",
-        selected_semester_type=semester_type_filter or "",
-        selected_school_year=school_year_filter or "",
-        selected_status=selected_status,
-        total_students=total_students,
-        total_requested=total_requested,
-        active_semester=active_semester,
-        active_school_year=active_school_year,
-        bar_data=json.dumps(bar_data),
-        top_course=top_course,
-        months=json.dumps(months),
-        monthly_counts=json.dumps(top_course_monthly),
+    return dict(
+        total_students=sum(enrollment.values()),
+        total_requested=total_requesters(**filters),
         courses_sorted=json.dumps(courses_sorted),
         counts_sorted=json.dumps(counts_sorted),
         totals_sorted=json.dumps(totals_sorted),
-        percentages_sorted=json.dumps(percentages_sorted),
-        percentage_courses_sorted=json.dumps(percentage_courses_sorted),
-        percentages_sorted_desc=json.dumps(percentages_sorted_desc)
+        percentages_sorted=json.dumps(percentages_sorted)
     )
 
 
 #STUDENTS PROMISSORY LIST
-@finance_bp.route("/students-promissory")
-@require_role("Finance")
-def students_promissory():
-    page = request.args.get("page", 1, type=int)
-    per_page = 10
-    export_format = request.args.get("export", None)
-
-    active_semester, active_school_year = get_active_settings()
+STUDENTS_EXPORT_HEADER = ["Student Name", "Course", "Year Level", "Semester", "Semester Type", "School Year",
+                          "Requests Count"]
 
-    all_courses = [c.name for c in ActiveCourse.query.order_by(ActiveCourse.name).all()]
-    all_semesters = [s[0] for s in db.session.query(PromissoryRequest.semester).distinct()]
-    all_school_years = [s[0] for s in db.session.query(PromissoryRequest.school_year).distinct()]
-
-    search = request.args.get("search", "").strip()
-    selected_semester = request.args.get("semester", None)
-    selected_semester_type = request.args.get("semester_type", None)
-    selected_course = request.args.get("course", None)
-    selected_year_level = request.args.get("year_level", None)
-    selected_school_year = request.args.get("school_year", None)
-
-    if selected_semester is None and 'page' not in request.args:
-        selected_semester = active_semester
-    if selected_school_year is None and 'page' not in request.args:
-        selected_school_year = active_school_year
 
+def students_promissory_query(search, semester, semester_type, course, year_level, school_year):
+    """Students with at least one matching request, plus the requests_count column."""
     students_query = db.session.query(Account).filter(Account._role == "Student")
 
     if search:
-        term = f"%{search}%"
-        students_query = students_query.filter(
-            func.concat(Account.first_name, ' ', Account.last_name).ilike(term) |
-            Account.first_name.ilike(term) |
-            Account.last_name.ilike(term)
-        )
+        students_query = students_query.filter(account_search_criterion(search))
 
-    if selected_course:
-        students_query = students_query.filter(Account.course == selected_course)
+    if course:
+        students_query = students_query.filter(Account.course == course)
 
-    if selected_year_level:
-        students_query = students_query.filter(Account.year_level == selected_year_level)
+    if year_level:
+        students_query = students_query.filter(Account.year_level == year_level)
 
     requests_query = db.session.query(
         PromissoryRequest.student_id,
         func.count(PromissoryRequest.id).label("requests_count")
     ).group_by(PromissoryRequest.student_id)
 
-    if selected_semester:
-        requests_query = requests_query.filter(PromissoryRequest.semester == selected_semester)
-    if selected_semester_type:
-        requests_query = requests_query.filter(PromissoryRequest.semester_type == selected_semester_type)
-    if selected_course:
-        requests_query = requests_query.filter(PromissoryRequest.course == selected_course)
-    if selected_school_year:
-        requests_query = requests_query.filter(PromissoryRequest.school_year == selected_school_year)
+    if semester:
+        requests_query = requests_query.filter(PromissoryRequest.semester == semester)
+    if semester_type:
+        requests_query = requests_query.filter(PromissoryRequest.semester_type == semester_type)
+    if course:
+        requests_query = requests_query.filter(PromissoryRequest.course == course)
+    if school_year:
+        requests_query = requests_query.filter(PromissoryRequest.school_year == school_year)
 
     requests_subq = requests_query.subquery()
 
+    requests_count = func.coalesce(requests_subq.c.requests_count, 0)
+
     students_query = students_query.outerjoin(
         requests_subq, requests_subq.c.student_id == Account.id
     ).add_columns(
-        func.coalesce(requests_subq.c.requests_count, 0).label("requests_count")
+        requests_count.label("requests_count")
     )
 
-    students_query = students_query.filter(
-        func.coalesce(requests_subq.c.requests_count, 0) > 0
+    return students_query.filter(requests_count > 0), requests_count
+
+
+@export_kind("students_promissory")
+def students_promissory_export(params):
+    query, requests_count = students_promissory_query(**params)
+    query = query.with_entities(
+        Account.first_name, Account.middle_name, Account.last_name, Account.suffix,
+        Account.course, Account.year_level, Account.id,
+        requests_count.label("requests_count")
+    )
+    return ExportSpec(
+        header=STUDENTS_EXPORT_HEADER,
+        query=query,
+        order=[(requests_count, "desc"), (Account.last_name, "asc"), (Account.id, "asc")],
+        # Seeking on the aggregate would re-run the GROUP BY per chunk; stream it once.
+        key=None,
+        format_row=lambda s: (
+            get_full_name(s),
+            s.course,
+            s.year_level,
+            params["semester"] or "All",
+            params["semester_type"] or "All",
+            params["school_year"] or "All",
+            s.requests_count
+        ),
+        filename="students_promissory",
+        sheet_name="Students Promissory"
     )
 
-    students_query = students_query.order_by(
-        func.coalesce(requests_subq.c.requests_count, 0).desc(),
-        Account.last_name
+
+@finance_bp.route("/students-promissory")
+@require_role("Finance")
+def students_promissory():
+    cursor = request.args.get("cursor")
+    per_page = 10
+    export_format = request.args.get("export", None)
+
+    active_semester, active_school_year = get_active_settings()
+
+    all_courses = active_course_names()
+    all_semesters = request_values("semester")
+    all_school_years = request_values("school_year")
+
+    search = request.args.get("search", "").strip()
+    selected_semester = request.args.get("semester", None)
+    selected_semester_type = request.args.get("semester_type", None)
+    selected_course = request.args.get("course", None)
+    selected_year_level = request.args.get("year_level", None)
+    selected_school_year = request.args.get("school_year", None)
+
+    if selected_semester is None and 'cursor' not in request.args:
+        selected_semester = active_semester
+    if selected_school_year is None and 'cursor' not in request.args:
+        selected_school_year = active_school_year
+
+    filters = dict(
+        search=search,
+        semester=selected_semester,
+        semester_type=selected_semester_type,
+        course=selected_course,
+        year_level=selected_year_level,
+        school_year=selected_school_year
     )
+    students_query, requests_count = students_promissory_query(**filters)
+    students_order = [(requests_count, "desc"), (Account.last_name, "asc"), (Account.id, "asc")]
 
     if export_format in ["csv", "excel"]:
-        students_data = students_query.all()
-        data = [{
-            "Student Name": get_full_name(s[0]),
-            "Course": s[0].course,
-            "Year Level": s[0].year_level,
-            "Semester": selected_semester or "All",
-            "Semester Type": selected_semester_type or "All",
-            "School Year": selected_school_year or "All",
-            "Requests Count": s[1]
-        } for s in students_data]
-
-        df = pd.DataFrame(data)
-        output = io.BytesIO()
-
-        if export_format == "csv":
-            df.to_csv(output, index=False)
-            output.seek(0)
-            return send_file(output, mimetype="text/csv",
-                             download_name="students_promissory.csv",
-                             as_attachment=True)
-        else:
-            with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-                df.to_excel(writer, index=False,
-                            sheet_name="Students Promissory")
-            output.seek(0)
-            return send_file(
-                output,
-                mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                download_name="students_promissory.xlsx",
-                as_attachment=True
-            )
-
-    students = students_query.paginate(page=page, per_page=per_page, error_out=False)
+        return start_export("students_promissory", export_format, filters)
+
+    students = keyset_paginate(
+        students_query,
+        order=students_order,
+        key=lambda row: (row.requests_count, row[0].last_name, row[0].id),
+        cursor=cursor,
+        per_page=per_page
+    )
 
     return render_template(
         "finance/students_promissory.html",
@@ -508,7 +486,10 @@ def update_promissory(promissory_id):
     promissory_req.comments = request.form.get("comments", "").strip()
     promissory_req.updated_at = datetime.now()
 
+    rollup_status_changed(promissory_req, old_status)
     db.session.commit()
+    invalidate_analytics()
+    invalidate_student_summary(promissory_req.student_id)
 
     log_action(
         user_name,
@@ -519,6 +500,135 @@ def update_promissory(promissory_id):
     return redirect(url_for("finance.view_promissory", promissory_id=promissory_id))
 
 
+#BULK UPDATE PROMISSORY
+BULK_DECISIONS = {"approve": "Approved", "reject": "Rejected"}
+MAX_BULK_IDS = 500
+
+
+def bulk_ids(value):
+    """Distinct ids from a list of integers or digit strings; None if ``value`` is anything else."""
+    if not isinstance(value, list):
+        return None
+    ids = []
+    for item in value:
+        if isinstance(item, str) and item.strip().isdigit():
+            item = int(item)
+        if not isinstance(item, int) or isinstance(item, bool):
+            return None
+        ids.append(item)
+    return list(dict.fromkeys(ids))
+
+
+def apply_bulk_decision(ids, new_status, comments, expected_status="Pending"):
+    """Move every request in ``ids`` still at ``expected_status`` to ``new_status``.
+
+    One locking SELECT, one guarded UPDATE and one rollup refresh,
+    however many ids are given. Returns ``(results, changed)``: a result
+    per id and the ``(id, old_status)`` pairs that were updated. Moving
+    to the status a request already has changes nothing.
+    """
+    reqs = {r.id: r for r in PromissoryRequest.query
+            .filter(PromissoryRequest.id.in_(ids))
+            .with_for_update()}
+    statuses = {i: r.status for i, r in reqs.items()}
+    eligible = [i for i in ids if statuses.get(i) == expected_status != new_status]
+
+    if eligible:
+        statement = update(PromissoryRequest) \
+            .where(PromissoryRequest.id.in_(eligible), PromissoryRequest.status == expected_status) \
+            .values(status=new_status, comments=comments) \
+            .execution_options(synchronize_session=False)
+        if db.session.get_bind().dialect.update_returning:
+            updated = set(db.session.execute(statement.returning(PromissoryRequest.id)).scalars())
+            eligible = [i for i in eligible if i in updated]
+        elif db.session.execute(statement).rowcount != len(eligible):
+            # Someone else decided some of these between our read and write
+            # (SELECT ... FOR UPDATE is a no-op here), and without RETURNING
+            # there is no telling which rows were ours: change nothing.
+            db.session.rollback()
+            statuses.update(db.session.query(PromissoryRequest.id, PromissoryRequest.status)
+                            .filter(PromissoryRequest.id.in_(eligible)))
+            eligible = []
+        refresh_rollup_cells([reqs[i] for i in eligible])
+    student_ids = [reqs[i].student_id for i in eligible]
+    db.session.commit()
+    if eligible:
+        invalidate_analytics()
+        invalidate_student_summary(*student_ids)
+
+    changed = set(eligible)
+    results = {}
+    for i in ids:
+        if i not in reqs:
+            results[i] = {"result": "not_found"}
+        elif i in changed:
+            results[i] = {"result": "updated", "status": new_status}
+        else:
+            results[i] = {"result": "conflict", "status": statuses[i]}
+    return results, [(i, expected_status) for i in eligible]
+
+
+@finance_bp.route("/promissory/bulk-update", methods=["POST"])
+@require_role("Finance")
+def bulk_update_promissory():
+    user_name = session.get("user_name", "Finance User")
+    data = request.get_json(silent=True) if request.is_json else None
+    if data is None:
+        data = {
+            "ids": request.form.getlist("ids"),
+            "action": request.form.get("action"),
+            "comments": request.form.get("comments", ""),
+            "expected_status": request.form.get("expected_status", "Pending"),
+        }
+    is_object = isinstance(data, dict)
+    if not is_object:
+        data = {}
+
+    action = str(data.get("action") or "").lower()
+    ids = bulk_ids(data.get("ids"))
+    expected_status = data.get("expected_status") or "Pending"
+
+    error = None
+    if not is_object:
+        error = "Send the decision as a JSON object."
+    elif action not in BULK_DECISIONS:
+        error = "Choose approve or reject."
+    elif not isinstance(expected_status, str):
+        error = "Invalid expected status."
+    elif expected_status == BULK_DECISIONS[action]:
+        error = f"These promissory notes are already {expected_status.lower()}."
+    elif ids is None:
+        error = "Promissory note ids must be a list of whole numbers."
+    elif not ids:
+        error = "Select at least one promissory note."
+    elif len(ids) > MAX_BULK_IDS:
+        error = f"At most {MAX_BULK_IDS} promissory notes can be updated at once."
+    if error:
+        if request.is_json:
+            return jsonify({"error": error}), 400
+        flash(error, "danger")
+        return redirect(request.referrer or url_for("finance.promissory_notes"))
+
+    new_status = BULK_DECISIONS[action]
+    results, changed = apply_bulk_decision(
+        ids, new_status, str(data.get("comments") or "").strip(), expected_status)
+
+    log_actions(user_name, [
+        f"{new_status} promissory note ID {i} (from {old_status} to {new_status})"
+        for i, old_status in changed
+    ])
+
+    if request.is_json:
+        return jsonify({"action": action, "updated": len(changed),
+                        "results": {str(i): result for i, result in results.items()}})
+
+    skipped = len(ids) - len(changed)
+    flash(f"{len(changed)} promissory note(s) {new_status.lower()}."
+          + (f" {skipped} skipped (already decided or not found)." if skipped else ""),
+          "success" if changed else "warning")
+    return redirect(request.referrer or url_for("finance.promissory_notes"))
+
+
 #VIEW PROMISSORY DETAILS 
 @finance_bp.route("/promissory/<int:promissory_id>")
 @require_role("Finance")
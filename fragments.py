@@ -0,0 +1,19 @@
+from markupsafe import Markup
+from cache import VersionedCache
+
+FRAGMENT_TTL = 300
+FRAGMENT_MAX_ENTRIES = 500
+
+fragment_cache = VersionedCache("fragments", ttl=FRAGMENT_TTL, max_entries=FRAGMENT_MAX_ENTRIES)
+
+
+def cached_fragment(name, params, version, render):
+    """Rendered HTML for fragment ``name``, re-rendered when ``params`` or ``version`` change.
+
+    ``version`` is the data version stamp (or tuple of stamps) the
+    fragment depends on; ``render`` runs only on a miss, so any queries
+    it makes are skipped too. The TTL bounds staleness for changes that
+    do not move a version stamp.
+    """
+    key = (name, tuple(sorted(params.items())), version)
+    return Markup(fragment_cache.get(key, lambda: str(render())))
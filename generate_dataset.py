@@ -0,0 +1,230 @@
+# generate_dataset.py
+"""Generate a reproducible synthetic dataset for load testing.
+
+    python generate_dataset.py --students 100000 --seed 42 --reset
+
+Rows are written with chunked Core INSERTs and explicit primary keys, so
+1M accounts / several million requests need no per-row lookups. The same
+seed always produces the same data.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert, func
+from werkzeug.security import generate_password_hash
+from app import app
+from models import db, Account, PromissoryRequest, ActiveSettings, ActiveCourse
+from analytics import rebuild_rollup
+from catalogs import invalidate_catalogs
+from settings import invalidate_settings
+from migrations import upgrade
+
+# -------------------------
+# DISTRIBUTIONS
+# -------------------------
+COURSES = {
+    "Bachelor of Science in Accountancy": 12,
+    "Bachelor of Science in Management Accounting": 8,
+    "Bachelor of Science in Nursing": 16,
+    "Bachelor of Science in Hospitality Management": 10,
+    "Bachelor of Science in Criminology": 13,
+    "Bachelor of Science in Information Technology": 15,
+    "Bachelor of Science in Computer Science": 9,
+    "Bachelor or Arts in Communication": 5,
+    "Bachelor or Arts in Psychology": 7,
+    "Bachelor of Science in Civil Engineering": 5,
+}
+YEAR_LEVELS = {"1st Year": 38, "2nd Year": 28, "3rd Year": 22, "4th Year": 12}
+STUDENT_STATUSES = {"Active": 92, "Inactive": 8}
+
+# Promissory notes per student: most students file one or two, a few file many.
+REQUESTS_PER_STUDENT = {0: 18, 1: 27, 2: 22, 3: 14, 4: 9, 5: 6, 6: 4}
+
+# Month ranges (month, year offset from the school year's start) per semester.
+SEMESTERS = {
+    "First Semester": [(8, 0), (9, 0), (10, 0), (11, 0), (12, 0)],
+    "Second Semester": [(1, 1), (2, 1), (3, 1), (4, 1), (5, 1)],
+    "Mid Year": [(6, 1), (7, 1)],
+}
+SEMESTER_WEIGHTS = {"First Semester": 46, "Second Semester": 42, "Mid Year": 12}
+SEMESTER_TYPES = {"Prelims": 30, "Midterms": 38, "Finals": 32}
+
+# Requests in the active term are still being processed; older ones are mostly settled.
+ACTIVE_TERM_STATUSES = {"Pending": 45, "Approved": 40, "Rejected": 15}
+PAST_TERM_STATUSES = {"Pending": 3, "Approved": 77, "Rejected": 20}
+
+ACTIVE_SEMESTER = "First Semester"
+
+FIRST_NAMES = [
+    "Juan", "Maria", "Jose", "Ana", "Mark", "John", "Paula", "Miguel", "Sofia", "Daniel",
+    "Renz", "Joshua", "Angela", "Carla", "Raven", "Bruce", "Ella", "Nicole", "Liam", "Zyra",
+    "Gabriel", "Kimberly", "Nathan", "Isabella", "Ethan", "Angel", "Claire", "Ryan", "Mikaela", "David",
+    "Hannah", "Leonardo", "Grace", "Patrick", "Jasmine", "Christian", "Ariana", "Samuel", "Rey", "Oliver",
+]
+MIDDLE_NAMES = ["", "", "", "Santos", "Reyes", "Cruz", "Garcia", "Lopez", "Ramos", "Flores"]
+LAST_NAMES = [
+    "Santos", "Reyes", "Cruz", "Bautista", "Torres", "Garcia", "Lopez", "Aquino", "Martinez", "Flores",
+    "Velasco", "Castillo", "Ramos", "Rivera", "Navarro", "Villanueva", "Salazar", "Pascual", "Morales",
+    "Cabrera", "Sison", "Alcantara", "Herrera", "Padilla", "Soriano", "Lim", "Tan", "Mendoza", "Pineda",
+    "Santiago", "Valdez", "Vergara", "Manalo", "Rosales", "Salvador", "Marquez", "Delgado", "Gonzales",
+]
+REASONS = [
+    "Financial hardship due to family emergency.",
+    "Delay in allowance from sponsor.",
+    "Unexpected medical expenses.",
+    "Temporary loss of income in the family.",
+    "Parents are currently unemployed.",
+    "Savings are insufficient this month.",
+    "Awaiting scholarship disbursement.",
+    "Unexpected household expenses.",
+    "Need extension to settle tuition fees.",
+    "Still processing financial documents.",
+]
+
+STAFF = [
+    ("Finance", "Admin", "finance@school.edu", "Finance", "password123"),
+    ("Master", "Admin", "admin@example.com", "Admin", "Admin@123"),
+    ("Super", "Admin", "superadmin@example.com", "Admin", "SuperAdmin@123"),
+]
+STUDENT_PASSWORD = "password123"
+
+
+def weighted(rng, table, k):
+    return rng.choices(list(table), weights=list(table.values()), k=k)
+
+
+def school_years(count, latest):
+    start = int(latest.split("-")[0])
+    return [f"{y}-{y + 1}" for y in range(start - count + 1, start + 1)]
+
+
+# -------------------------
+# ROW GENERATORS
+# -------------------------
+def student_rows(rng, first_id, count, password_hash):
+    courses = weighted(rng, COURSES, count)
+    years = weighted(rng, YEAR_LEVELS, count)
+    statuses = weighted(rng, STUDENT_STATUSES, count)
+    for n in range(count):
+        account_id = first_id + n
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield {
+            "id": account_id,
+            "first_name": first,
+            "middle_name": rng.choice(MIDDLE_NAMES),
+            "last_name": last,
+            "suffix": "",
+            "email": f"{first.lower()}.{last.lower()}.{account_id}@school.edu",
+            "role": "Student",
+            "status": statuses[n],
+            "password_hash": password_hash,
+            "plain_password": STUDENT_PASSWORD,
+            "year_level": years[n],
+            "course": courses[n],
+        }
+
+
+def request_rows(rng, students, terms, active_year):
+    """Promissory requests for ``students`` (dicts from student_rows)."""
+    for student in students:
+        for _ in range(weighted(rng, REQUESTS_PER_STUDENT, 1)[0]):
+            school_year = rng.choice(terms)
+            semester = weighted(rng, SEMESTER_WEIGHTS, 1)[0]
+            month, offset = rng.choice(SEMESTERS[semester])
+            requested_at = datetime(int(school_year[:4]) + offset, month, rng.randint(1, 28)) \
+                + timedelta(seconds=rng.randint(7 * 3600, 19 * 3600))
+            active = school_year == active_year and semester == ACTIVE_SEMESTER
+            status = weighted(rng, ACTIVE_TERM_STATUSES if active else PAST_TERM_STATUSES, 1)[0]
+            yield {
+                "student_id": student["id"],
+                "year_level": student["year_level"],
+                "course": student["course"],
+                "email": student["email"],
+                "reason_text": rng.choice(REASONS),
+                "semester_type": weighted(rng, SEMESTER_TYPES, 1)[0],
+                "semester": semester,
+                "school_year": school_year,
+                "status": status,
+                "comments": None if status == "Pending" else "Reviewed by finance.",
+                "requested_at": requested_at,
+            }
+
+
+def insert_chunked(table, rows, chunk_size):
+    chunk, total = [], 0
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            db.session.execute(insert(table), chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        db.session.execute(insert(table), chunk)
+        total += len(chunk)
+    return total
+
+
+# -------------------------
+# MAIN
+# -------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic load-testing dataset.")
+    parser.add_argument("--students", type=int, default=10000, help="student accounts to create")
+    parser.add_argument("--school-years", type=int, default=3, help="school years to spread requests over")
+    parser.add_argument("--active-school-year", default="2025-2026")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    terms = school_years(args.school_years, args.active_school_year)
+    started = time.perf_counter()
+
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+            db.session.execute(db.text("DROP TABLE IF EXISTS account_search"))
+            db.session.commit()
+            db.create_all()
+            upgrade()
+            print("✔ Database cleared and tables created")
+
+            db.session.execute(insert(ActiveCourse.__table__), [{"name": c} for c in COURSES])
+            db.session.execute(insert(ActiveSettings.__table__), [{
+                "active_semester": ACTIVE_SEMESTER, "active_school_year": args.active_school_year}])
+            db.session.execute(insert(Account.__table__), [{
+                "first_name": first, "middle_name": "", "last_name": last, "suffix": "", "email": email,
+                "role": role, "status": "Active", "password_hash": generate_password_hash(password),
+                "plain_password": password, "year_level": None, "course": None,
+            } for first, last, email, role, password in STAFF])
+            db.session.commit()
+            print(f"✔ {len(COURSES)} courses, active settings and {len(STAFF)} staff accounts created")
+
+        first_id = (db.session.query(func.max(Account.id)).scalar() or 0) + 1
+        password_hash = generate_password_hash(STUDENT_PASSWORD)
+
+        accounts = requests = 0
+        remaining = args.students
+        while remaining:
+            batch = list(student_rows(rng, first_id + accounts, min(args.chunk_size, remaining), password_hash))
+            accounts += insert_chunked(Account.__table__, batch, args.chunk_size)
+            requests += insert_chunked(PromissoryRequest.__table__,
+                                       request_rows(rng, batch, terms, args.active_school_year),
+                                       args.chunk_size)
+            db.session.commit()
+            remaining -= len(batch)
+            print(f"  {accounts} students, {requests} requests")
+
+        cells = rebuild_rollup()
+        invalidate_catalogs()
+        invalidate_settings()
+
+    print(f"✔ {accounts} student accounts and {requests} promissory requests created")
+    print(f"✔ Request rollup rebuilt ({cells} cells)")
+    print(f"🎉 DONE in {time.perf_counter() - started:.1f}s (seed {args.seed})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import argparse
+from app import app
+from models import db
+from migrations import upgrade, pending_migrations
+from schema_check import table_scan_report
+
+parser = argparse.ArgumentParser(description="Manage the promissory database schema.")
+parser.add_argument("command", nargs="?", default="upgrade", choices=["upgrade", "status", "check-scans"],
+                    help="upgrade: apply pending migrations; status: list pending migrations; "
+                         "check-scans: report route queries that still scan whole tables")
+args = parser.parse_args()
+
+with app.app_context():
+    if args.command == "upgrade":
+        db.create_all()
+        applied = upgrade()
+        for version, description in applied:
+            print(f"✔ Applied migration {version}: {description}")
+        if not applied:
+            print("✔ Database schema is up to date")
+
+    elif args.command == "status":
+        pending = pending_migrations()
+        for version, description, _ in pending:
+            print(f"Pending migration {version}: {description}")
+        if not pending:
+            print("✔ No pending migrations")
+
+    else:
+        if pending_migrations():
+            print("! There are pending migrations; run `python migrate.py upgrade` first")
+        report = table_scan_report(app)
+        for route, table, statement in report:
+            bounded = " (bounded by LIMIT)" if " LIMIT " in statement else ""
+            print(f"{route}: full scan of {table}{bounded}\n    {' '.join(statement.split())}\n")
+        print(f"{len(report)} table scan(s) found")
@@ -0,0 +1,155 @@
+import mimetypes
+import os
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import inspect, select, update, func, or_, text, MetaData, Table, Column, Integer, String, DateTime
+from models import (db, PromissoryRequest, Account, SystemLog, RequestRollup, SchemaMigration, ExportJob,
+                    DocumentBlob)
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    """Register ``upgrade(conn)`` as schema version ``version``."""
+    def register(upgrade):
+        MIGRATIONS.append((version, description, upgrade))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return upgrade
+    return register
+
+
+def _create_indexes(conn, table, names):
+    existing = {ix["name"] for ix in inspect(conn).get_indexes(table.name)}
+    for index in table.indexes:
+        if index.name in names and index.name not in existing:
+            index.create(conn)
+
+
+#MIGRATIONS
+@migration(1, "Create request rollup table and backfill it")
+def _request_rollup(conn):
+    from analytics import rollup_backfill_statement
+    RequestRollup.__table__.create(conn, checkfirst=True)
+    if not conn.execute(select(func.count()).select_from(RequestRollup.__table__)).scalar():
+        conn.execute(rollup_backfill_statement())
+
+
+@migration(2, "Add indexes for route filters and orderings")
+def _route_indexes(conn):
+    _create_indexes(conn, PromissoryRequest.__table__, {
+        "ix_promissory_request_term_status",
+        "ix_promissory_request_term_course",
+        "ix_promissory_request_student",
+        "ix_promissory_request_requested_at",
+    })
+    _create_indexes(conn, Account.__table__, {
+        "ix_account_role_status",
+        "ix_account_role_course",
+        "ix_account_last_name",
+    })
+    _create_indexes(conn, SystemLog.__table__, {
+        "ix_system_log_timestamp",
+        "ix_system_log_user_name",
+    })
+
+
+@migration(3, "Create account name search index")
+def _account_search(conn):
+    from search import create_search_index
+    create_search_index(conn)
+
+
+@migration(4, "Create export job table")
+def _export_jobs(conn):
+    ExportJob.__table__.create(conn, checkfirst=True)
+
+
+# Frozen copy of the per-upload metadata table; migration 6 replaces it with DocumentBlob.
+_stored_file = Table(
+    "stored_file", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("student_id", Integer, nullable=False),
+    Column("category", String(50), nullable=False),
+    Column("path", String(255), unique=True, nullable=False),
+    Column("original_name", String(255)),
+    Column("content_type", String(100)),
+    Column("size", Integer, nullable=False),
+    Column("sha256", String(64), nullable=False, index=True),
+    Column("created_at", DateTime),
+)
+
+
+# Upload metadata from before the blob store; migration 6 carries its
+# content types over to document_blob and then drops it.
+@migration(5, "Create stored file table")
+def _stored_files(conn):
+    _stored_file.create(conn, checkfirst=True)
+
+
+@migration(6, "Move uploaded documents into the content-addressed store")
+def _document_blobs(conn):
+    from uploads import blob_root, write_blob, add_reference, is_blob_id
+    DocumentBlob.__table__.create(conn, checkfirst=True)
+
+    table = PromissoryRequest.__table__
+    rows = conn.execute(select(table.c.id, table.c.reason_doc, table.c.valid_id)
+                        .where(or_(table.c.reason_doc != None, table.c.valid_id != None))).all()
+    recorded_types = {}
+    if inspect(conn).has_table("stored_file"):
+        recorded_types = dict(conn.execute(select(_stored_file.c.path, _stored_file.c.content_type)).all())
+    for row in rows:
+        values = {}
+        for column in ("reason_doc", "valid_id"):
+            path = getattr(row, column)
+            if not path or is_blob_id(path):
+                continue
+            source = os.path.join(current_app.static_folder, path)
+            if not os.path.exists(source):
+                values[column] = None
+                continue
+            with open(source, "rb") as f:
+                blob_id, size = write_blob(f, blob_root())
+            content_type = recorded_types.get(path) or mimetypes.guess_type(path)[0]
+            add_reference(conn, blob_id, size, content_type)
+            values[column] = blob_id
+        if values:
+            conn.execute(update(table).where(table.c.id == row.id).values(**values))
+
+    _stored_file.drop(conn, checkfirst=True)
+
+
+@migration(7, "Add export job heartbeat")
+def _export_job_heartbeat(conn):
+    if "heartbeat_at" not in {c["name"] for c in inspect(conn).get_columns("export_job")}:
+        conn.execute(text("ALTER TABLE export_job ADD COLUMN heartbeat_at DATETIME"))
+
+
+@migration(8, "Drop request rollup student count")
+def _drop_rollup_student_count(conn):
+    # Distinct students do not add up across cells, so nothing could read it.
+    if "student_count" in {c["name"] for c in inspect(conn).get_columns("request_rollup")}:
+        conn.execute(text("ALTER TABLE request_rollup DROP COLUMN student_count"))
+
+
+#RUNNER
+def applied_versions(conn):
+    SchemaMigration.__table__.create(conn, checkfirst=True)
+    return {row[0] for row in conn.execute(select(SchemaMigration.version))}
+
+
+def pending_migrations():
+    with db.engine.begin() as conn:
+        applied = applied_versions(conn)
+    return [m for m in MIGRATIONS if m[0] not in applied]
+
+
+def upgrade():
+    """Apply pending migrations in order, each in its own transaction."""
+    applied = []
+    for version, description, run in pending_migrations():
+        with db.engine.begin() as conn:
+            run(conn)
+            conn.execute(SchemaMigration.__table__.insert().values(
+                version=version, description=description, applied_at=datetime.utcnow()))
+        applied.append((version, description))
+    return applied
@@ -19,6 +19,12 @@ class Account(db.Model):
     year_level = db.Column(db.String(20))
     course = db.Column(db.String(100))
 
+    __table_args__ = (
+        db.Index("ix_account_role_status", "role", "status"),
+        db.Index("ix_account_role_course", "role", "course", "year_level"),
+        db.Index("ix_account_last_name", "last_name", "first_name"),
+    )
+
     @property
     def role(self):
         return self._role
@@ -71,6 +77,13 @@ class PromissoryRequest(db.Model):
     comments = db.Column(db.Text)
     requested_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index("ix_promissory_request_term_status", "school_year", "semester", "status", "requested_at"),
+        db.Index("ix_promissory_request_term_course", "school_year", "semester", "course", "student_id"),
+        db.Index("ix_promissory_request_student", "student_id", "requested_at"),
+        db.Index("ix_promissory_request_requested_at", "requested_at", "id"),
+    )
+
     def __repr__(self):
         return f"<PromissoryRequest {self.id} by {self.student.full_name}>"
 
@@ -106,5 +119,81 @@ class SystemLog(db.Model):
     action = db.Column(db.String(255), nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index("ix_system_log_timestamp", "timestamp", "id"),
+        db.Index("ix_system_log_user_name", "user_name"),
+    )
+
     def __repr__(self):
         return f"<SystemLog {self.action} by {self.user_name or 'System'} at {self.timestamp}>"
+
+
+class SchemaMigration(db.Model):
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    description = db.Column(db.String(255), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SchemaMigration {self.version} {self.description}>"
+
+
+class RequestRollup(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+
+    school_year = db.Column(db.String(20))
+    semester = db.Column(db.String(50))
+    semester_type = db.Column(db.String(50))
+    course = db.Column(db.String(100))
+    month = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20))
+
+    request_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint("school_year", "semester", "semester_type", "course", "month", "status",
+                            name="uq_request_rollup_cell"),
+    )
+
+    def __repr__(self):
+        return f"<RequestRollup {self.school_year} {self.semester} {self.course} m{self.month} {self.status}={self.request_count}>"
+
+
+class ExportJob(db.Model):
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('account.id'), nullable=False)
+    kind = db.Column(db.String(50), nullable=False)
+    export_format = db.Column(db.String(10), nullable=False)
+    params = db.Column(db.Text, nullable=False, default="{}")
+
+    status = db.Column(db.String(20), nullable=False, default="Queued")
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer)
+    filename = db.Column(db.String(255), nullable=False)
+    error = db.Column(db.String(255))
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    expires_at = db.Column(db.DateTime)
+    # Touched on every status/progress write; a job that stops moving was interrupted.
+    heartbeat_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index("ix_export_job_user_created", "user_id", "created_at"),
+        db.Index("ix_export_job_expires_at", "expires_at"),
+    )
+
+    def __repr__(self):
+        return f"<ExportJob {self.id} {self.kind} {self.status} {self.progress}/{self.total}>"
+
+
+
+class DocumentBlob(db.Model):
+    # SHA-256 of the content; PromissoryRequest.reason_doc/valid_id hold this id
+    id = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    content_type = db.Column(db.String(100))
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<DocumentBlob {self.id[:12]} {self.size}B refs={self.ref_count}>"
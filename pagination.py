@@ -0,0 +1,200 @@
+import base64
+import binascii
+import json
+import math
+from datetime import datetime
+from sqlalchemy import and_, or_, func
+from models import db
+
+COUNT_CAP = 1000
+
+
+#CURSOR TOKENS
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(key, direction, offset):
+    payload = {"k": [_encode_value(v) for v in key], "d": direction, "o": offset}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _matches_column(column, value):
+    """Whether a decoded key value can be compared with ``column``."""
+    if value is None:
+        return True
+    if isinstance(value, (dict, list)):
+        return False
+    try:
+        expected = column.type.python_type
+    except (AttributeError, NotImplementedError):
+        return True
+    if expected is datetime:
+        return isinstance(value, datetime)
+    if expected is int:
+        return isinstance(value, int) and not isinstance(value, bool)
+    if expected is float:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return isinstance(value, expected)
+
+
+def decode_cursor(token, order):
+    """Decode a cursor token for ``order``, returning None for missing or malformed tokens.
+
+    The key must hold one value per ``order`` column, each of a type the
+    column can be compared with; anything else falls back to the first page.
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        key = [_decode_value(v) for v in payload["k"]]
+        position = {
+            "key": key,
+            "direction": "prev" if payload["d"] == "prev" else "next",
+            "offset": max(int(payload.get("o", 0)), 0)
+        }
+    except (binascii.Error, ValueError, KeyError, TypeError, AttributeError):
+        return None
+    if len(key) != len(order):
+        return None
+    if not all(_matches_column(column, value) for (column, _), value in zip(order, key)):
+        return None
+    return position
+
+
+#KEYSET PAGINATION
+class KeysetPagination:
+    """One page of a keyset (seek) paginated query.
+
+    Mirrors the attributes the templates use from Flask-SQLAlchemy's
+    ``Pagination`` (``items``, ``page``, ``pages``, ``has_prev``,
+    ``has_next``) but navigates with ``prev_cursor``/``next_cursor``.
+    """
+
+    def __init__(self, items, per_page, offset, has_prev, has_next, prev_cursor, next_cursor, total, total_capped):
+        self.items = items
+        self.per_page = per_page
+        self.offset = offset
+        self.has_prev = has_prev
+        self.has_next = has_next
+        self.prev_cursor = prev_cursor
+        self.next_cursor = next_cursor
+        self.total = total
+        self.total_capped = total_capped
+
+    @property
+    def page(self):
+        return self.offset // self.per_page + 1
+
+    @property
+    def pages(self):
+        if self.total is None:
+            return None
+        return max(math.ceil(self.total / self.per_page), self.page)
+
+    @property
+    def pages_label(self):
+        if self.pages is None:
+            return "?"
+        return f"{self.pages}+" if self.total_capped else str(self.pages)
+
+
+def _seek_condition(order, key, backwards):
+    """Row-value comparison "after ``key``" expanded for mixed sort directions."""
+    clauses = []
+    for i, (column, direction) in enumerate(order):
+        descending = (direction == "desc") != backwards
+        step = column < key[i] if descending else column > key[i]
+        clauses.append(and_(*[order[j][0] == key[j] for j in range(i)], step))
+    return or_(*clauses)
+
+
+def _order_by(order, backwards):
+    clauses = []
+    for column, direction in order:
+        descending = (direction == "desc") != backwards
+        clauses.append(column.desc() if descending else column.asc())
+    return clauses
+
+
+def capped_count(query, cap=COUNT_CAP):
+    """Count at most ``cap + 1`` rows, so the cost is bounded on huge tables."""
+    limited = query.order_by(None).limit(cap + 1).subquery()
+    total = db.session.query(func.count()).select_from(limited).scalar()
+    return min(total, cap), total > cap
+
+
+def keyset_paginate(query, order, key, cursor=None, per_page=10, count_cap=COUNT_CAP):
+    """Paginate ``query`` by seeking past the last row instead of using OFFSET.
+
+    ``order`` is a list of ``(column, "asc"|"desc")`` pairs ending in a
+    unique column; ``key`` maps a result row to its values for those
+    columns. ``count_cap`` enables an approximate total (None skips it).
+    """
+    position = decode_cursor(cursor, order)
+    backwards = position is not None and position["direction"] == "prev"
+
+    page_query = query
+    if position:
+        page_query = page_query.filter(_seek_condition(order, position["key"], backwards))
+    rows = page_query.order_by(*_order_by(order, backwards)).limit(per_page + 1).all()
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    offset = position["offset"] if position else 0
+
+    if backwards:
+        rows.reverse()
+        has_prev, has_next = has_more, True
+        if not has_more:
+            offset = 0
+    else:
+        has_prev, has_next = position is not None and offset > 0, has_more
+
+    prev_cursor = encode_cursor(key(rows[0]), "prev", max(offset - per_page, 0)) if rows and has_prev else None
+    next_cursor = encode_cursor(key(rows[-1]), "next", offset + per_page) if rows and has_next else None
+
+    total, total_capped = (None, False)
+    if count_cap:
+        total, total_capped = capped_count(query, count_cap)
+
+    return KeysetPagination(rows, per_page, offset, has_prev, has_next, prev_cursor, next_cursor,
+                            total, total_capped)
+
+
+def iter_keyset(query, order, key, chunk_size=1000):
+    """Yield every row of ``query`` in ``order``, one short keyset query per chunk.
+
+    Unlike a streamed cursor, no statement stays open between chunks, so
+    a long-running reader does not hold database read locks the whole
+    time and can commit in between.
+    """
+    position = None
+    while True:
+        chunk_query = query if position is None else query.filter(_seek_condition(order, position, False))
+        rows = chunk_query.order_by(*_order_by(order, False)).limit(chunk_size).all()
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        position = key(rows[-1])
+
+
+def iter_ordered(query, order, chunk_size=1000):
+    """Yield every row of ``query`` in ``order`` from one streamed statement.
+
+    For queries ordered by an aggregate, where each iter_keyset chunk
+    would re-run the whole GROUP BY. The statement stays open until the
+    last row is read.
+    """
+    return query.order_by(*_order_by(order, False)).yield_per(chunk_size)
@@ -0,0 +1,45 @@
+from collections import namedtuple
+from flask import g, session
+from models import db, Account
+from cache import VersionedCache
+
+PRINCIPAL_TTL = 30
+
+principal_cache = VersionedCache("principals", ttl=PRINCIPAL_TTL)
+
+PRINCIPAL_COLUMNS = (Account.id, Account._role, Account._status, Account.email,
+                     Account.first_name, Account.middle_name, Account.last_name, Account.suffix)
+
+
+#PRINCIPAL
+class Principal(namedtuple("Principal", "id role status email first_name middle_name last_name suffix")):
+    """The signed-in account's identity, detached from the database session."""
+
+    @property
+    def full_name(self):
+        return " ".join(filter(None, [self.first_name, self.middle_name, self.last_name, self.suffix]))
+
+
+def _load_principal(user_id):
+    row = db.session.query(*PRINCIPAL_COLUMNS).filter(Account.id == user_id).first()
+    return Principal(*row) if row else None
+
+
+def current_principal():
+    """Principal for ``session["user_id"]``, loaded at most once per request.
+
+    Between requests it is cached per worker for PRINCIPAL_TTL seconds;
+    call invalidate_principals() after changing an account's role or
+    status so every worker sees the change on its next request.
+    """
+    user_id = session.get("user_id")
+    if not user_id:
+        return None
+    if "principal" not in g:
+        g.principal = principal_cache.get(user_id, lambda: _load_principal(user_id))
+    return g.principal
+
+
+def invalidate_principals():
+    principal_cache.invalidate()
+    g.pop("principal", None)
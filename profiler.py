@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+from collections import Counter
+from flask import g, request, current_app, has_request_context
+from sqlalchemy import event
+from models import db
+
+SLOWEST_KEPT = 5
+REPEAT_THRESHOLD = 5
+
+_route_stats = {}
+_stats_lock = threading.Lock()
+
+
+#ENGINE HOOKS
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "sql_profile" in g:
+        context._profile_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_profile_started", None)
+    if started is not None and has_request_context() and "sql_profile" in g:
+        g.sql_profile.append((statement, (time.perf_counter() - started) * 1000))
+
+
+#REQUEST HOOKS
+def _start_profile():
+    g.sql_profile = []
+
+
+def _summarize(profile):
+    repeats = Counter(statement for statement, _ in profile)
+    return {
+        "statements": len(profile),
+        "db_ms": sum(ms for _, ms in profile),
+        "repeated": {s: n for s, n in repeats.items() if n >= REPEAT_THRESHOLD},
+    }
+
+
+def _profile_headers(response):
+    profile = g.get("sql_profile")
+    if profile is not None and (current_app.debug or current_app.config.get("SQL_PROFILING_HEADERS")):
+        summary = _summarize(profile)
+        response.headers["X-SQL-Queries"] = str(summary["statements"])
+        response.headers["X-SQL-Time-ms"] = f"{summary['db_ms']:.1f}"
+        response.headers["X-SQL-Repeated"] = str(len(summary["repeated"]))
+    return response
+
+
+def _record_profile(exc=None):
+    # Runs at teardown so statements issued while streaming a response are included.
+    profile = g.pop("sql_profile", None)
+    if profile is None or request.endpoint is None:
+        return
+    summary = _summarize(profile)
+    slowest = sorted(profile, key=lambda item: item[1], reverse=True)[:SLOWEST_KEPT]
+
+    with _stats_lock:
+        stats = _route_stats.setdefault(request.endpoint, {
+            "endpoint": request.endpoint, "requests": 0, "statements": 0, "db_ms": 0.0,
+            "max_statements": 0, "slowest": [], "repeated": {}
+        })
+        stats["requests"] += 1
+        stats["statements"] += summary["statements"]
+        stats["db_ms"] += summary["db_ms"]
+        stats["max_statements"] = max(stats["max_statements"], summary["statements"])
+        stats["slowest"] = sorted(stats["slowest"] + slowest, key=lambda item: item[1],
+                                  reverse=True)[:SLOWEST_KEPT]
+        for statement, count in summary["repeated"].items():
+            stats["repeated"][statement] = max(stats["repeated"].get(statement, 0), count)
+
+
+#SETUP
+def profiling_enabled(app):
+    return app.config.get("SQL_PROFILING", os.environ.get("SQL_PROFILING") == "1")
+
+
+def init_profiler(app):
+    """Opt-in per-request SQL profiling (SQL_PROFILING config or env var).
+
+    Collects statement counts, DB time, the slowest statements and
+    statements repeated REPEAT_THRESHOLD+ times in one request (likely
+    N+1 loads) per endpoint, in this worker's memory. In debug mode the
+    per-request figures are also sent as X-SQL-* response headers.
+    """
+    if not profiling_enabled(app):
+        return
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(db.engine, "after_cursor_execute", _after_cursor_execute)
+    app.before_request(_start_profile)
+    app.after_request(_profile_headers)
+    app.teardown_request(_record_profile)
+
+
+#REPORT
+def profile_report():
+    """Per-endpoint stats, worst N+1 offenders first."""
+    with _stats_lock:
+        rows = [dict(stats, slowest=list(stats["slowest"]), repeated=dict(stats["repeated"]))
+                for stats in _route_stats.values()]
+    for row in rows:
+        row["avg_statements"] = row["statements"] / row["requests"]
+        row["avg_db_ms"] = row["db_ms"] / row["requests"]
+    return sorted(rows, key=lambda r: (len(r["repeated"]), r["avg_statements"]), reverse=True)
+
+
+def reset_profile():
+    with _stats_lock:
+        _route_stats.clear()
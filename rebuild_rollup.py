@@ -0,0 +1,8 @@
+from app import app
+from models import db
+from analytics import rebuild_rollup
+
+with app.app_context():
+    db.create_all()
+    cells = rebuild_rollup()
+    print(f"✔ Request rollup rebuilt ({cells} cells)")
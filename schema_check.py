@@ -0,0 +1,77 @@
+import re
+from sqlalchemy import event
+from models import db, Account
+
+HOT_ROUTES = [
+    ("Finance", "/finance/dashboard"),
+    ("Finance", "/finance/promissory-notes"),
+    ("Finance", "/finance/promissory-notes?status=All&export=csv"),
+    ("Finance", "/finance/all-promissory"),
+    ("Finance", "/finance/all-promissory?school_year=all&semester=all"),
+    ("Finance", "/finance/students-promissory"),
+    ("Admin", "/admin/dashboard"),
+    ("Admin", "/admin/accounts"),
+    ("Admin", "/admin/logs"),
+    ("Student", "/student/dashboard"),
+    ("Student", "/student/history"),
+]
+
+
+def capture_route_statements(app, routes=HOT_ROUTES):
+    """Run each route through the test client and collect the SELECTs it issues.
+
+    Routes are requested as the first account of the matching role, so
+    this also writes their audit log entries; run it against a copy or a
+    development database.
+    """
+    users = {role: Account.query.filter_by(_role=role).first() for role, _ in routes}
+    statements = {}
+    current = {}
+
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            statements.setdefault(statement, (current["route"], parameters))
+
+    event.listen(db.engine, "before_cursor_execute", collect)
+    try:
+        for role, url in routes:
+            user = users.get(role)
+            if user is None:
+                continue
+            client = app.test_client()
+            with client.session_transaction() as sess:
+                sess["user_id"] = user.id
+                sess["role"] = user.role
+                sess["user_name"] = f"{user.first_name} {user.last_name}"
+            current["route"] = url
+            client.get(url).get_data()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", collect)
+    return statements
+
+
+def _scanned_tables(conn, statement, parameters):
+    tables = set(db.metadata.tables)
+    if conn.dialect.name == "sqlite":
+        plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        scans = set()
+        for row in plan:
+            match = re.match(r"SCAN (\w+)(.*)", row[-1])
+            if match and match.group(1) in tables and "USING" not in match.group(2):
+                scans.add(match.group(1))
+        return scans
+    if conn.dialect.name == "mysql":
+        plan = conn.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().fetchall()
+        return {row["table"] for row in plan if row["type"] == "ALL" and row["table"] in tables}
+    return set()
+
+
+def table_scan_report(app, routes=HOT_ROUTES):
+    """List ``(route, table, statement)`` for every route query that scans a whole table."""
+    statements = capture_route_statements(app, routes)
+    report = []
+    with db.engine.connect() as conn:
+        for statement, (route, parameters) in statements.items():
+            for table in sorted(_scanned_tables(conn, statement, parameters)):
+                report.append((route, table, statement))
+    return report
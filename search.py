@@ -0,0 +1,117 @@
+import re
+from sqlalchemy import text, or_, and_
+from models import db, Account
+
+SEARCH_COLUMNS = ("first_name", "middle_name", "last_name", "email")
+MYSQL_MIN_TOKEN = 3
+
+_index_available = {}
+
+
+#SEARCH INDEX DDL
+SQLITE_INDEX_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS account_search USING fts5(
+        first_name, middle_name, last_name, email,
+        content='account', content_rowid='id', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS account_search_ai AFTER INSERT ON account BEGIN
+        INSERT INTO account_search(rowid, first_name, middle_name, last_name, email)
+        VALUES (new.id, new.first_name, new.middle_name, new.last_name, new.email);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS account_search_ad AFTER DELETE ON account BEGIN
+        INSERT INTO account_search(account_search, rowid, first_name, middle_name, last_name, email)
+        VALUES ('delete', old.id, old.first_name, old.middle_name, old.last_name, old.email);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS account_search_au
+    AFTER UPDATE OF first_name, middle_name, last_name, email ON account BEGIN
+        INSERT INTO account_search(account_search, rowid, first_name, middle_name, last_name, email)
+        VALUES ('delete', old.id, old.first_name, old.middle_name, old.last_name, old.email);
+        INSERT INTO account_search(rowid, first_name, middle_name, last_name, email)
+        VALUES (new.id, new.first_name, new.middle_name, new.last_name, new.email);
+    END""",
+    "INSERT INTO account_search(account_search) VALUES ('rebuild')",
+]
+
+MYSQL_INDEX_DDL = [
+    "ALTER TABLE account ADD FULLTEXT INDEX ft_account_search (first_name, middle_name, last_name, email)",
+]
+
+
+def create_search_index(conn):
+    """Create the name search index for the connection's dialect.
+
+    On SQLite the FTS5 table is an external-content index over ``account``
+    kept in sync by triggers, so every writer (forms, imports, seed
+    scripts) updates it. MySQL maintains FULLTEXT indexes itself.
+    """
+    if conn.dialect.name == "sqlite":
+        for statement in SQLITE_INDEX_DDL:
+            conn.exec_driver_sql(statement)
+    elif conn.dialect.name == "mysql":
+        existing = conn.exec_driver_sql(
+            "SHOW INDEX FROM account WHERE Key_name = 'ft_account_search'").fetchall()
+        if not existing:
+            for statement in MYSQL_INDEX_DDL:
+                conn.exec_driver_sql(statement)
+    _index_available.clear()
+
+
+def _has_search_index():
+    url = str(db.engine.url)
+    if url not in _index_available:
+        dialect = db.engine.dialect.name
+        with db.engine.connect() as conn:
+            if dialect == "sqlite":
+                found = conn.exec_driver_sql(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'account_search'").first()
+            elif dialect == "mysql":
+                found = conn.exec_driver_sql(
+                    "SHOW INDEX FROM account WHERE Key_name = 'ft_account_search'").first()
+            else:
+                found = None
+        _index_available[url] = found is not None
+    return _index_available[url]
+
+
+#NAME SEARCH
+def search_tokens(term):
+    return re.findall(r"\w+", term.lower())
+
+
+def _like_criterion(tokens):
+    return and_(*[
+        or_(*[getattr(Account, column).ilike(f"%{token}%") for column in SEARCH_COLUMNS])
+        for token in tokens
+    ])
+
+
+def account_search_criterion(term):
+    """Criterion matching accounts whose name or email has a word starting with each search token.
+
+    Served by the FTS5/FULLTEXT index when it exists; otherwise falls back
+    to substring matching so search keeps working on unmigrated databases.
+    """
+    tokens = search_tokens(term)
+    if not tokens:
+        return Account.id.isnot(None)
+    if not _has_search_index():
+        return _like_criterion(tokens)
+
+    if db.engine.dialect.name == "sqlite":
+        query = " AND ".join(f'"{token}"*' for token in tokens)
+        matches = text("SELECT rowid FROM account_search WHERE account_search MATCH :query") \
+            .bindparams(query=query).columns(rowid=db.Integer)
+        return Account.id.in_(matches)
+
+    short = [t for t in tokens if len(t) < MYSQL_MIN_TOKEN]
+    long = [t for t in tokens if len(t) >= MYSQL_MIN_TOKEN]
+    criteria = []
+    if long:
+        query = " ".join(f"+{token}*" for token in long)
+        criteria.append(text(
+            "MATCH (account.first_name, account.middle_name, account.last_name, account.email) "
+            "AGAINST (:query IN BOOLEAN MODE)"
+        ).bindparams(query=query))
+    if short:
+        criteria.append(_like_criterion(short))
+    return and_(*criteria)
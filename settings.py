@@ -0,0 +1,24 @@
+from models import ActiveSettings
+from cache import VersionedCache
+
+NOT_SET = "Not Set"
+
+settings_cache = VersionedCache("settings")
+
+
+#ACTIVE SETTINGS
+def _load_active_settings():
+    settings = ActiveSettings.query.first()
+    if not settings:
+        return NOT_SET, NOT_SET
+    return settings.active_semester, settings.active_school_year
+
+
+def get_active_settings():
+    """``(active_semester, active_school_year)``, cached per worker until the settings change."""
+    return settings_cache.get("active", _load_active_settings)
+
+
+def invalidate_settings():
+    """Call after committing a change to ActiveSettings."""
+    settings_cache.invalidate()
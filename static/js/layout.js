@@ -0,0 +1,4 @@
+// Sidebar toggle shared by the admin and finance pages.
+function toggleSidebar() {
+  document.getElementById('sidebar').classList.toggle('open');
+}
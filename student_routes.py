@@ -1,13 +1,23 @@
-from flask import Blueprint, render_template, redirect, url_for, request, flash, session
+from flask import Blueprint, render_template, redirect, url_for, request, flash, session, jsonify
 from functools import wraps
 from datetime import datetime
-from models import db, Account, PromissoryRequest, ActiveSettings, SystemLog
-import os
-from werkzeug.utils import secure_filename
+from sqlalchemy.orm import load_only
+from models import db, Account, PromissoryRequest
+from analytics import rollup_request_added, rollup_request_removed, invalidate_analytics
+from catalogs import note_request_values
+from audit import log_action
+from settings import get_active_settings
+from principal import current_principal, invalidate_principals
+from student_summary import student_summary, student_school_years, invalidate_student_summary, summary_json
+from uploads import save_upload, release_blobs, remove_blob_files
+from pagination import keyset_paginate
 
 student_bp = Blueprint("student", __name__,
                        url_prefix="/student", template_folder="templates")
 
+HISTORY_PAGE_SIZE = 20
+HISTORY_FILTERS = ["status", "semester", "semester_type", "school_year"]
+
 
 #UTILITY FUNCTION
 def require_role(role=None):
@@ -19,7 +29,7 @@ def require_role(role=None):
                 flash("Please log in first.", "warning")
                 return redirect(url_for("login"))
 
-            user = Account.query.get(user_id)
+            user = current_principal()
             if not user or user.status == "Inactive":
                 flash("Your account is inactive. Please contact the admin.", "danger")
                 return redirect(url_for("student.inactive_notice"))
@@ -37,37 +47,6 @@ def get_full_name(acc):
     return " ".join(filter(None, [acc.first_name, acc.middle_name, acc.last_name, getattr(acc, "suffix", "")]))
 
 
-def save_file(file_obj, student_id, category="reason"):
-    if not file_obj or not getattr(file_obj, 'filename', None):
-        return None
-
-    ext = file_obj.filename.rsplit('.', 1)[-1].lower() if '.' in file_obj.filename else ''
-    student_folder = os.path.join('static', 'uploads', f'student_{student_id}')
-    os.makedirs(student_folder, exist_ok=True)
-
-    existing_files = [f for f in os.listdir(student_folder) if f.startswith(category)]
-    numbers = []
-    for f in existing_files:
-        try:
-            numbers.append(int(f.rsplit('_', 1)[-1].split('.')[0]))
-        except ValueError:
-            continue
-    next_num = max(numbers) + 1 if numbers else 1
-
-    filename = f"{category}_{next_num}{'.' + ext if ext else ''}"
-    filepath = os.path.join(student_folder, filename)
-    file_obj.save(filepath)
-
-    return f"uploads/student_{student_id}/{filename}"
-
-
-def log_action(user_name, action):
-    """Optional logging for student actions"""
-    log = SystemLog(user_name=user_name, action=action)
-    db.session.add(log)
-    db.session.commit()
-
-
 #INACTIVE ACCOUNT NOTICE
 @student_bp.route("/inactive")
 def inactive_notice():
@@ -77,26 +56,14 @@ def inactive_notice():
 @student_bp.route("/dashboard")
 @require_role("Student")
 def dashboard():
-    student = Account.query.get(session["user_id"])
-    total_promissory = PromissoryRequest.query.filter_by(student_id=student.id).count()
-    active_promissory = PromissoryRequest.query.filter_by(student_id=student.id, status="Pending").count()
-
-    recent_requests = PromissoryRequest.query.filter(
-        PromissoryRequest.student_id == student.id,
-        PromissoryRequest.status.in_(["Approved", "Rejected"])
-    ).order_by(PromissoryRequest.requested_at.desc()).limit(5).all()
-
-    rejected_requests = PromissoryRequest.query.filter_by(student_id=student.id, status="Rejected").all()
-    incomplete_requests = PromissoryRequest.query.filter(
-        PromissoryRequest.student_id == student.id,
-        (PromissoryRequest.reason_doc == None) | (PromissoryRequest.valid_id == None)
-    ).all()
+    student = current_principal()
+    summary = student_summary(student.id)
 
     data = {
         "full_name": get_full_name(student),
         "role": student.role,
-        "total_promissory": total_promissory,
-        "active_promissory": active_promissory,
+        "total_promissory": summary.total,
+        "active_promissory": summary.pending,
         "current_time": datetime.now().strftime("%B %d, %Y %I:%M %p")
     }
 
@@ -105,9 +72,16 @@ def dashboard():
     return render_template("student/dashboard.html",
                            student=student,
                            data=data,
-                           recent_requests=recent_requests,
-                           rejected_requests=rejected_requests,
-                           incomplete_requests=incomplete_requests)
+                           recent_requests=summary.recent,
+                           rejected_count=summary.rejected,
+                           incomplete_count=summary.incomplete)
+
+
+#SUMMARY API
+@student_bp.route("/api/summary")
+@require_role("Student")
+def summary_api():
+    return jsonify(summary_json(student_summary(current_principal().id)))
 
 
 #REQUEST PROMISSORY
@@ -115,8 +89,7 @@ def dashboard():
 @require_role("Student")
 def request_promissory():
     student = Account.query.get(session["user_id"])
-    active_settings = ActiveSettings.query.first()
-    semester, school_year = (active_settings.active_semester, active_settings.active_school_year) if active_settings else ("Not Set", "Not Set")
+    semester, school_year = get_active_settings()
 
     if request.method == "POST":
         reason_text = request.form.get("reason_text", "").strip()
@@ -124,9 +97,6 @@ def request_promissory():
         reason_file = request.files.get("reason_doc")
         valid_id_file = request.files.get("valid_id")
 
-        reason_doc = save_file(reason_file, student.id, "reason") if reason_file else None
-        valid_id = save_file(valid_id_file, student.id, "valid_id") if valid_id_file else None
-
         existing_request = PromissoryRequest.query.filter_by(
             student_id=student.id,
             semester_type=semester_type,
@@ -142,10 +112,14 @@ def request_promissory():
                 flash(f"You already have a pending {semester_type} request for {semester} ({school_year}).", "danger")
                 return redirect(url_for("student.request_promissory"))
 
-        if not reason_text and not reason_doc:
+        if not reason_text and not (reason_file and reason_file.filename):
             flash("Please provide a reason or upload a document.", "danger")
             return redirect(url_for("student.request_promissory"))
 
+        # Saved only once the request is accepted, so rejected submissions leave no files behind.
+        reason_doc = save_upload(reason_file)
+        valid_id = save_upload(valid_id_file)
+
         new_request = PromissoryRequest(
             student_id=student.id,
             year_level=student.year_level,
@@ -162,7 +136,12 @@ def request_promissory():
         )
 
         db.session.add(new_request)
+        db.session.flush()
+        rollup_request_added(new_request)
         db.session.commit()
+        invalidate_analytics()
+        invalidate_student_summary(student.id)
+        note_request_values(new_request)
         log_action(student.email, f"Submitted promissory request for {semester_type} {semester} {school_year}")
         flash("Your promissory request has been submitted.", "success")
         return redirect(url_for("student.request_promissory"))
@@ -176,42 +155,87 @@ def request_promissory():
 @student_bp.route("/history")
 @require_role("Student")
 def history():
-    student = Account.query.get(session["user_id"])
-    query = PromissoryRequest.query.filter_by(student_id=student.id)
+    student = current_principal()
+    page = history_page(student.id, request.args)
+
+    log_action(student.email, "Viewed promissory request history")
+    return render_template("student/history.html",
+                           student=student,
+                           requests=page.items,
+                           next_cursor=page.next_cursor,
+                           school_years=student_school_years(student.id))
+
 
-    for key in ["status", "semester", "semester_type", "school_year"]:
-        value = request.args.get(key, "").strip()
+def history_page(student_id, args):
+    """One keyset page of the student's requests, newest first, filtered by ``args``.
+
+    Only the columns the history table shows are loaded, so long
+    reason_text values stay out of the page.
+    """
+    query = PromissoryRequest.query.filter_by(student_id=student_id).options(load_only(
+        PromissoryRequest.id, PromissoryRequest.requested_at, PromissoryRequest.course,
+        PromissoryRequest.semester, PromissoryRequest.semester_type,
+        PromissoryRequest.school_year, PromissoryRequest.status))
+
+    for key in HISTORY_FILTERS:
+        value = args.get(key, "").strip()
         if value:
             query = query.filter(getattr(PromissoryRequest, key) == value)
 
-    requests = query.order_by(PromissoryRequest.requested_at.desc()).all()
+    return keyset_paginate(
+        query,
+        order=[(PromissoryRequest.requested_at, "desc"), (PromissoryRequest.id, "desc")],
+        key=lambda r: (r.requested_at, r.id),
+        cursor=args.get("cursor"),
+        per_page=HISTORY_PAGE_SIZE,
+        count_cap=None
+    )
+
+
+def history_json(req):
+    return {
+        "id": req.id,
+        "requested_at": req.requested_at.isoformat(),
+        "date": req.requested_at.strftime("%m/%d/%Y"),
+        "time": req.requested_at.strftime("%I:%M %p"),
+        "course": req.course,
+        "semester": req.semester,
+        "semester_type": req.semester_type,
+        "school_year": req.school_year,
+        "status": req.status,
+        "view_url": url_for("student.view_request", request_id=req.id),
+        "delete_url": url_for("student.delete_request", request_id=req.id),
+    }
 
-    school_years = [sy[0] for sy in db.session.query(PromissoryRequest.school_year)
-                    .filter_by(student_id=student.id)
-                    .distinct()
-                    .order_by(PromissoryRequest.school_year.desc())
-                    .all()]
 
-    log_action(student.email, "Viewed promissory request history")
-    return render_template("student/history.html",
-                           student=student,
-                           requests=requests,
-                           school_years=school_years)
+#HISTORY API
+@student_bp.route("/api/history")
+@require_role("Student")
+def history_api():
+    """Next page of history rows; pass the returned next_cursor back as ?cursor=."""
+    page = history_page(current_principal().id, request.args)
+    return jsonify({"items": [history_json(req) for req in page.items],
+                    "next_cursor": page.next_cursor})
 
 #DELETE REQUEST
 @student_bp.route("/delete_request/<int:request_id>", methods=["POST"])
 @require_role("Student")
 def delete_request(request_id):
-    student_id = session["user_id"]
-    student = Account.query.get(student_id)
+    student = current_principal()
+    student_id = student.id
     req = PromissoryRequest.query.filter_by(id=request_id, student_id=student_id).first()
     if not req:
         flash("Request not found.", "danger")
     elif req.status != "Pending":
         flash("Only pending requests can be deleted.", "warning")
     else:
+        rollup_request_removed(req)
+        orphaned = release_blobs([req.reason_doc, req.valid_id])
         db.session.delete(req)
         db.session.commit()
+        invalidate_analytics()
+        invalidate_student_summary(student_id)
+        remove_blob_files(orphaned)
         flash("Pending request has been deleted.", "success")
         log_action(student.email, f"Deleted pending promissory request ID {request_id}")
     return redirect(url_for("student.history"))
@@ -234,6 +258,7 @@ def setup():
             student.set_password(password)
 
         db.session.commit()
+        invalidate_principals()
         flash("Profile updated successfully!", "success")
         log_action(student.email, "Updated profile information")
         return redirect(url_for("student.setup"))
@@ -246,8 +271,8 @@ def setup():
 @student_bp.route("/view_request/<int:request_id>")
 @require_role("Student")
 def view_request(request_id):
-    student_id = session["user_id"]
-    student = Account.query.get(student_id)
+    student = current_principal()
+    student_id = student.id
     req = PromissoryRequest.query.filter_by(id=request_id, student_id=student_id).first()
     if not req:
         flash("Request not found.", "danger")
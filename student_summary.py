@@ -0,0 +1,82 @@
+from collections import namedtuple
+from sqlalchemy import func, case, or_
+from models import db, PromissoryRequest
+from cache import VersionedCache, get_version, bump_version
+
+RECENT_LIMIT = 5
+SUMMARY_TTL = 300
+SUMMARY_MAX_ENTRIES = 5000
+
+summary_cache = VersionedCache("student_summaries", ttl=SUMMARY_TTL, max_entries=SUMMARY_MAX_ENTRIES)
+
+StudentSummary = namedtuple("StudentSummary", "total pending approved rejected incomplete recent")
+RecentRequest = namedtuple("RecentRequest", "id requested_at course semester semester_type school_year status")
+
+
+def _version_name(student_id):
+    return f"students/{student_id}"
+
+
+#SUMMARY
+def _count(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _load_summary(student_id):
+    total, pending, approved, rejected, incomplete = db.session.query(
+        func.count(PromissoryRequest.id),
+        _count(PromissoryRequest.status == "Pending"),
+        _count(PromissoryRequest.status == "Approved"),
+        _count(PromissoryRequest.status == "Rejected"),
+        _count(or_(PromissoryRequest.reason_doc == None, PromissoryRequest.valid_id == None))
+    ).filter(PromissoryRequest.student_id == student_id).one()
+
+    recent = [RecentRequest(*row) for row in db.session.query(
+        PromissoryRequest.id, PromissoryRequest.requested_at, PromissoryRequest.course,
+        PromissoryRequest.semester, PromissoryRequest.semester_type, PromissoryRequest.school_year,
+        PromissoryRequest.status
+    ).filter(
+        PromissoryRequest.student_id == student_id,
+        PromissoryRequest.status.in_(["Approved", "Rejected"])
+    ).order_by(PromissoryRequest.requested_at.desc(), PromissoryRequest.id.desc()).limit(RECENT_LIMIT)]
+
+    return StudentSummary(total, pending, approved, rejected, incomplete, recent)
+
+
+def student_summary(student_id):
+    """Request counts and the latest decided requests for one student.
+
+    Counts come from a single conditional-aggregation statement and the
+    recent list is capped at RECENT_LIMIT. Results are cached per
+    student until invalidate_student_summary() is called for them.
+    """
+    version = get_version(_version_name(student_id))
+    return summary_cache.get((student_id, version), lambda: _load_summary(student_id))
+
+
+def student_school_years(student_id):
+    """Distinct school years the student has requested in, newest first; cached like the summary."""
+    version = get_version(_version_name(student_id))
+    return summary_cache.get(("school_years", student_id, version), lambda: [
+        sy for (sy,) in db.session.query(PromissoryRequest.school_year)
+        .filter(PromissoryRequest.student_id == student_id)
+        .distinct()
+        .order_by(PromissoryRequest.school_year.desc())
+    ])
+
+
+def invalidate_student_summary(*student_ids):
+    """Call after committing changes to these students' requests."""
+    for student_id in set(student_ids):
+        bump_version(_version_name(student_id))
+
+
+def summary_json(summary):
+    return {
+        "total": summary.total,
+        "pending": summary.pending,
+        "approved": summary.approved,
+        "rejected": summary.rejected,
+        "incomplete": summary.incomplete,
+        "recent": [dict(r._asdict(), requested_at=r.requested_at.isoformat()) for r in summary.recent],
+    }
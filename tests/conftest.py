@@ -0,0 +1,90 @@
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# app reads DATABASE_URL on import, so point it at a scratch database first.
+INSTANCE = tempfile.mkdtemp(prefix="promissory-tests-")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(INSTANCE, "test.db")
+
+from app import app as flask_app  # noqa: E402
+from migrations import upgrade  # noqa: E402
+from models import db, Account, PromissoryRequest, RequestRollup  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app():
+    flask_app.config["TESTING"] = True
+    flask_app.instance_path = INSTANCE
+    # Write audit entries inline so tests can read them straight back.
+    flask_app.extensions.pop("audit_log", None)
+    with flask_app.app_context():
+        db.create_all()
+        upgrade()
+    return flask_app
+
+
+@pytest.fixture(autouse=True)
+def app_context(app):
+    with app.app_context():
+        yield
+        db.session.rollback()
+        for table in reversed(db.metadata.sorted_tables):
+            if table.name != "schema_migration":
+                db.session.execute(table.delete())
+        db.session.commit()
+        db.session.remove()
+
+
+def make_account(role="Student", email=None, course="BSIT", year_level="1st Year"):
+    account = Account(first_name="Test", last_name=role, email=email or f"{role.lower()}-{Account.query.count()}@example.com",
+                      role=role, status="Active", course=course, year_level=year_level)
+    account.set_password("secret")
+    db.session.add(account)
+    db.session.commit()
+    return account
+
+
+def make_request(student, status="Pending", school_year="2025-2026", semester="1st Semester",
+                 semester_type="Prelim", requested_at=None):
+    """Add a request and count it in the rollup, as the student form does."""
+    from analytics import rollup_request_added
+
+    req = PromissoryRequest(student_id=student.id, year_level=student.year_level, course=student.course,
+                            email=student.email, status=status, school_year=school_year, semester=semester,
+                            semester_type=semester_type, requested_at=requested_at or datetime(2025, 9, 15))
+    db.session.add(req)
+    db.session.flush()
+    rollup_request_added(req)
+    db.session.commit()
+    return req
+
+
+def signed_in(app, account):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["user_id"] = account.id
+        sess["role"] = account.role
+        sess["user_name"] = f"{account.first_name} {account.last_name}"
+    return client
+
+
+def rollup_snapshot():
+    return sorted(
+        (r.school_year, r.semester, r.semester_type, r.course, r.month, r.status, r.request_count)
+        for r in RequestRollup.query
+    )
+
+
+def assert_rollup_matches_recompute():
+    """The incrementally maintained rollup must equal a full rebuild."""
+    from analytics import rebuild_rollup
+
+    maintained = rollup_snapshot()
+    rebuild_rollup()
+    assert maintained == rollup_snapshot()
@@ -0,0 +1,208 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, update
+
+from conftest import make_account, make_request, signed_in, assert_rollup_matches_recompute
+from models import db, PromissoryRequest, RequestRollup, SystemLog
+
+URL = "/finance/promissory/bulk-update"
+
+
+def statuses(*reqs):
+    db.session.expire_all()
+    return [db.session.get(PromissoryRequest, r.id).status for r in reqs]
+
+
+@pytest.fixture
+def finance(app):
+    return signed_in(app, make_account("Finance"))
+
+
+@pytest.fixture
+def student():
+    return make_account("Student")
+
+
+def test_guarded_update_only_moves_expected_status(finance, student):
+    pending = make_request(student)
+    approved = make_request(student, status="Approved")
+    rejected = make_request(student, status="Rejected", semester="2nd Semester")
+
+    response = finance.post(URL, json={"ids": [pending.id, approved.id, rejected.id, 999999],
+                                       "action": "reject", "comments": " late "})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["updated"] == 1
+    assert body["results"] == {
+        str(pending.id): {"result": "updated", "status": "Rejected"},
+        str(approved.id): {"result": "conflict", "status": "Approved"},
+        str(rejected.id): {"result": "conflict", "status": "Rejected"},
+        "999999": {"result": "not_found"},
+    }
+    assert statuses(pending, approved, rejected) == ["Rejected", "Approved", "Rejected"]
+    assert db.session.get(PromissoryRequest, pending.id).comments == "late"
+    assert [log.action for log in SystemLog.query] == [
+        f"Rejected promissory note ID {pending.id} (from Pending to Rejected)"]
+    assert_rollup_matches_recompute()
+
+
+def test_expected_status_other_than_pending(finance, student):
+    approved = make_request(student, status="Approved")
+    pending = make_request(student)
+
+    body = finance.post(URL, json={"ids": [approved.id, pending.id], "action": "reject",
+                                   "expected_status": "Approved"}).get_json()
+
+    assert body["updated"] == 1
+    assert body["results"][str(pending.id)] == {"result": "conflict", "status": "Pending"}
+    assert statuses(approved, pending) == ["Rejected", "Pending"]
+    assert_rollup_matches_recompute()
+
+
+def test_rollup_matches_recompute_across_terms_and_months(finance, student):
+    reqs = [
+        make_request(student, semester=semester, semester_type=semester_type, requested_at=datetime(2025, month, 3))
+        for semester in ("1st Semester", "2nd Semester")
+        for semester_type in ("Prelim", "Midterm")
+        for month in (8, 11)
+    ]
+    untouched = make_request(student, semester="Summer")
+
+    finance.post(URL, json={"ids": [r.id for r in reqs[::2]], "action": "approve"})
+    assert_rollup_matches_recompute()
+    finance.post(URL, json={"ids": [r.id for r in reqs], "action": "reject"})
+    assert_rollup_matches_recompute()
+
+    assert statuses(*reqs) == ["Approved", "Rejected"] * 4
+    assert statuses(untouched) == ["Pending"]
+
+
+def test_single_update_keeps_rollup_in_step(finance, student):
+    req = make_request(student)
+    finance.post(f"/finance/promissory/{req.id}/update", data={"action": "approve", "comments": ""})
+    assert statuses(req) == ["Approved"]
+    assert_rollup_matches_recompute()
+
+
+def decided_elsewhere(req, status):
+    """Have another reviewer decide ``req`` just before the bulk UPDATE runs."""
+    def before_update(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE PROMISSORY_REQUEST") and not fired:
+            fired.append(True)
+            with db.engine.begin() as other:
+                other.execute(update(PromissoryRequest).where(PromissoryRequest.id == req.id)
+                              .values(status=status))
+                other.execute(update(RequestRollup).where(RequestRollup.status == "Pending")
+                              .values(request_count=RequestRollup.request_count - 1))
+                other.execute(update(RequestRollup).where(RequestRollup.status == status)
+                              .values(request_count=RequestRollup.request_count + 1))
+
+    fired = []
+    event.listen(db.engine, "before_cursor_execute", before_update)
+    return lambda: event.remove(db.engine, "before_cursor_execute", before_update)
+
+
+def test_row_decided_between_read_and_write_is_not_credited(finance, student):
+    ours = make_request(student)
+    theirs = make_request(student)
+    # Seed the cell the other reviewer moves the request into.
+    make_request(student, status="Approved")
+
+    stop = decided_elsewhere(theirs, "Approved")
+    try:
+        body = finance.post(URL, json={"ids": [ours.id, theirs.id], "action": "reject"}).get_json()
+    finally:
+        stop()
+
+    assert db.engine.dialect.update_returning
+    assert body["updated"] == 1
+    assert body["results"][str(ours.id)] == {"result": "updated", "status": "Rejected"}
+    assert body["results"][str(theirs.id)]["result"] == "conflict"
+    assert statuses(ours, theirs) == ["Rejected", "Approved"]
+    assert [log.action for log in SystemLog.query] == [
+        f"Rejected promissory note ID {ours.id} (from Pending to Rejected)"]
+    assert_rollup_matches_recompute()
+
+
+def test_race_without_returning_changes_nothing(finance, student, monkeypatch):
+    monkeypatch.setattr(db.engine.dialect, "update_returning", False)
+    ours = make_request(student)
+    theirs = make_request(student)
+    make_request(student, status="Approved")
+
+    stop = decided_elsewhere(theirs, "Approved")
+    try:
+        body = finance.post(URL, json={"ids": [ours.id, theirs.id], "action": "reject"}).get_json()
+    finally:
+        stop()
+
+    assert body["updated"] == 0
+    assert body["results"] == {
+        str(ours.id): {"result": "conflict", "status": "Pending"},
+        str(theirs.id): {"result": "conflict", "status": "Approved"},
+    }
+    assert statuses(ours, theirs) == ["Pending", "Approved"]
+    assert SystemLog.query.count() == 0
+    assert_rollup_matches_recompute()
+
+
+@pytest.mark.parametrize("payload, error", [
+    ([1, 2], "Send the decision as a JSON object."),
+    ("approve", "Send the decision as a JSON object."),
+    ({"ids": "12", "action": "approve"}, "Promissory note ids must be a list of whole numbers."),
+    ({"ids": [True], "action": "approve"}, "Promissory note ids must be a list of whole numbers."),
+    ({"ids": [1.5], "action": "approve"}, "Promissory note ids must be a list of whole numbers."),
+    ({"ids": [None], "action": "approve"}, "Promissory note ids must be a list of whole numbers."),
+    ({"ids": {"1": 1}, "action": "approve"}, "Promissory note ids must be a list of whole numbers."),
+    ({"ids": [], "action": "approve"}, "Select at least one promissory note."),
+    ({"ids": [1], "action": "delete"}, "Choose approve or reject."),
+    ({"ids": [1], "action": "approve", "expected_status": ["Pending"]}, "Invalid expected status."),
+    ({"ids": [1], "action": "approve", "expected_status": "Approved"}, "These promissory notes are already approved."),
+    ({"ids": list(range(1, 502)), "action": "approve"}, "At most 500 promissory notes can be updated at once."),
+])
+def test_invalid_input_is_rejected(finance, student, payload, error):
+    req = make_request(student)
+
+    response = finance.post(URL, json=payload)
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
+    assert statuses(req) == ["Pending"]
+
+
+def test_digit_string_ids_are_accepted(finance, student):
+    req = make_request(student)
+    body = finance.post(URL, json={"ids": [str(req.id), req.id], "action": "approve"}).get_json()
+    assert body["updated"] == 1
+    assert list(body["results"]) == [str(req.id)]
+
+
+def test_form_submission_flashes_summary(finance, student):
+    pending = make_request(student)
+    approved = make_request(student, status="Approved")
+
+    response = finance.post(URL, data={"ids": [str(pending.id), str(approved.id)], "action": "approve"},
+                            headers={"Referer": "/finance/promissory-notes"})
+
+    assert response.status_code == 302
+    with finance.session_transaction() as sess:
+        assert sess["_flashes"] == [("success", "1 promissory note(s) approved. 1 skipped (already decided or not found).")]
+    assert statuses(pending, approved) == ["Approved", "Approved"]
+
+
+def test_form_submission_with_bad_ids_changes_nothing(finance, student):
+    req = make_request(student)
+    response = finance.post(URL, data={"ids": ["1; DROP"], "action": "approve"})
+    assert response.status_code == 302
+    with finance.session_transaction() as sess:
+        assert sess["_flashes"] == [("danger", "Promissory note ids must be a list of whole numbers.")]
+    assert statuses(req) == ["Pending"]
+
+
+def test_requires_finance_role(app, student):
+    req = make_request(student)
+    response = signed_in(app, student).post(URL, json={"ids": [req.id], "action": "approve"})
+    assert response.status_code == 302
+    assert statuses(req) == ["Pending"]
@@ -0,0 +1,58 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from models import PromissoryRequest, Account
+from pagination import encode_cursor, decode_cursor
+
+ORDER = [(PromissoryRequest.requested_at, "desc"), (PromissoryRequest.id, "desc")]
+
+
+def token(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def test_round_trip():
+    key = [datetime(2025, 9, 15, 8, 30, 1, 250), 42]
+    assert decode_cursor(encode_cursor(key, "prev", 20), ORDER) == {"key": key, "direction": "prev", "offset": 20}
+
+
+def test_unknown_direction_and_negative_offset_are_clamped():
+    position = decode_cursor(token({"k": [{"dt": "2025-09-15T08:30:00"}, 1], "d": "sideways", "o": -5}), ORDER)
+    assert position["direction"] == "next"
+    assert position["offset"] == 0
+
+
+def test_null_key_values_are_allowed():
+    order = [(Account.course, "asc"), (Account.id, "asc")]
+    assert decode_cursor(encode_cursor([None, 3], "next", 10), order)["key"] == [None, 3]
+
+
+@pytest.mark.parametrize("cursor", [
+    None,
+    "",
+    "not base64!",
+    token([1, 2]),
+    token({"d": "next"}),
+    token({"k": [{"dt": "yesterday"}, 1], "d": "next"}),
+    token({"k": [{"dt": "2025-09-15T08:30:00"}, 1], "d": "next", "o": "many"}),
+    # one value per order column
+    token({"k": [{"dt": "2025-09-15T08:30:00"}], "d": "next"}),
+    token({"k": [{"dt": "2025-09-15T08:30:00"}, 1, 2], "d": "next"}),
+    # each value must fit its column
+    token({"k": ["2025-09-15T08:30:00", 1], "d": "next"}),
+    token({"k": [{"dt": "2025-09-15T08:30:00"}, "1"], "d": "next"}),
+    token({"k": [{"dt": "2025-09-15T08:30:00"}, True], "d": "next"}),
+    token({"k": [{"dt": "2025-09-15T08:30:00"}, 1.5], "d": "next"}),
+    token({"k": [{"dt": "2025-09-15T08:30:00"}, [1]], "d": "next"}),
+])
+def test_malformed_cursors_fall_back_to_first_page(cursor):
+    assert decode_cursor(cursor, ORDER) is None
+
+
+def test_string_column_rejects_numbers():
+    order = [(Account.last_name, "asc"), (Account.id, "asc")]
+    assert decode_cursor(token({"k": [7, 1], "d": "next"}), order) is None
+    assert decode_cursor(token({"k": ["Cruz", 1], "d": "next"}), order)["key"] == ["Cruz", 1]
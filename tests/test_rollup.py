@@ -0,0 +1,69 @@
+from datetime import datetime
+
+from analytics import (rebuild_rollup, rollup_request_removed, rollup_status_changed, status_counts,
+                       refresh_rollup_cells)
+from conftest import make_account, make_request, assert_rollup_matches_recompute, rollup_snapshot
+from models import db, PromissoryRequest, RequestRollup
+
+
+def test_added_requests_share_a_cell():
+    student = make_account("Student")
+    make_request(student)
+    make_request(student)
+    make_request(student, requested_at=datetime(2025, 10, 1))
+
+    assert rollup_snapshot() == [
+        ("2025-2026", "1st Semester", "Prelim", "BSIT", 9, "Pending", 2),
+        ("2025-2026", "1st Semester", "Prelim", "BSIT", 10, "Pending", 1),
+    ]
+    assert_rollup_matches_recompute()
+
+
+def test_null_dimensions_do_not_duplicate_cells():
+    student = make_account("Student")
+    make_request(student, semester_type=None)
+    make_request(student, semester_type=None)
+
+    assert RequestRollup.query.count() == 1
+    assert RequestRollup.query.one().request_count == 2
+    assert_rollup_matches_recompute()
+
+
+def test_status_change_moves_the_count_and_drops_empty_cells():
+    student = make_account("Student")
+    req = make_request(student)
+
+    req.status = "Approved"
+    rollup_status_changed(req, "Pending")
+    db.session.commit()
+
+    assert [cell[5:] for cell in rollup_snapshot()] == [("Approved", 1)]
+    assert status_counts() == {"Pending": 0, "Approved": 1, "Rejected": 0, "Total": 1}
+    assert_rollup_matches_recompute()
+
+
+def test_removed_request_is_uncounted():
+    student = make_account("Student")
+    make_request(student)
+    gone = make_request(student, status="Rejected")
+
+    rollup_request_removed(gone)
+    db.session.delete(gone)
+    db.session.commit()
+
+    assert [cell[5:] for cell in rollup_snapshot()] == [("Pending", 1)]
+    assert_rollup_matches_recompute()
+
+
+def test_refresh_recomputes_only_the_given_terms():
+    student = make_account("Student")
+    first = make_request(student)
+    make_request(student, semester="2nd Semester")
+    PromissoryRequest.query.update({"status": "Approved"}, synchronize_session=False)
+
+    refresh_rollup_cells([first])
+    db.session.commit()
+
+    assert {(cell[1], cell[5]) for cell in rollup_snapshot()} == {
+        ("1st Semester", "Approved"), ("2nd Semester", "Pending")}
+    assert rebuild_rollup() == 2
@@ -0,0 +1,85 @@
+import io
+import os
+
+from werkzeug.datastructures import FileStorage
+
+from models import db, DocumentBlob
+from uploads import blob_path, release_blobs, remove_blob_files, save_upload
+
+
+def upload(data, filename="proof.pdf", content_type="application/pdf"):
+    return FileStorage(stream=io.BytesIO(data), filename=filename, content_type=content_type)
+
+
+def ref_count(blob_id):
+    db.session.expire_all()
+    blob = db.session.get(DocumentBlob, blob_id)
+    return blob.ref_count if blob else None
+
+
+def test_identical_uploads_share_one_blob():
+    first = save_upload(upload(b"same bytes"))
+    second = save_upload(upload(b"same bytes", filename="copy.pdf"))
+    other = save_upload(upload(b"other bytes"))
+    db.session.commit()
+
+    assert first == second != other
+    assert ref_count(first) == 2
+    assert ref_count(other) == 1
+    blob = db.session.get(DocumentBlob, first)
+    assert (blob.size, blob.content_type) == (len(b"same bytes"), "application/pdf")
+    with open(blob_path(first), "rb") as f:
+        assert f.read() == b"same bytes"
+    assert not [name for name in os.listdir(os.path.dirname(blob_path(first))) if name.endswith(".part")]
+
+
+def test_empty_upload_is_ignored():
+    assert save_upload(None) is None
+    assert save_upload(upload(b"", filename="")) is None
+    assert DocumentBlob.query.count() == 0
+
+
+def test_file_is_removed_with_its_last_reference():
+    blob_id = save_upload(upload(b"shared"))
+    save_upload(upload(b"shared"))
+    db.session.commit()
+
+    assert release_blobs([blob_id, None]) == []
+    db.session.commit()
+    remove_blob_files([])
+    assert ref_count(blob_id) == 1
+    assert os.path.exists(blob_path(blob_id))
+
+    orphaned = release_blobs([blob_id])
+    db.session.commit()
+    assert orphaned == [blob_id]
+    remove_blob_files(orphaned)
+    assert ref_count(blob_id) is None
+    assert not os.path.exists(blob_path(blob_id))
+
+
+def test_blob_referenced_again_before_removal_is_kept():
+    blob_id = save_upload(upload(b"reused"))
+    db.session.commit()
+    orphaned = release_blobs([blob_id])
+    db.session.commit()
+
+    save_upload(upload(b"reused"))
+    db.session.commit()
+    remove_blob_files(orphaned)
+
+    assert ref_count(blob_id) == 1
+    assert os.path.exists(blob_path(blob_id))
+
+
+def test_reupload_after_removal_restores_the_file():
+    blob_id = save_upload(upload(b"again"))
+    db.session.commit()
+    remove_blob_files(release_blobs([blob_id]))
+    assert not os.path.exists(blob_path(blob_id))
+
+    assert save_upload(upload(b"again")) == blob_id
+    db.session.commit()
+    assert ref_count(blob_id) == 1
+    with open(blob_path(blob_id), "rb") as f:
+        assert f.read() == b"again"
@@ -0,0 +1,135 @@
+import hashlib
+import os
+import re
+import tempfile
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import update, delete, select
+from models import db, DocumentBlob
+from upsert import increment_row
+
+CHUNK_SIZE = 64 * 1024
+BLOB_ID = re.compile(r"[0-9a-f]{64}")
+
+
+#PATHS
+def blob_root(app=None):
+    return os.path.join((app or current_app).instance_path, "documents")
+
+
+def blob_path(blob_id, root=None):
+    return os.path.join(root or blob_root(), blob_id[:2], blob_id)
+
+
+def is_blob_id(value):
+    return bool(value) and BLOB_ID.fullmatch(value) is not None
+
+
+#CONTENT
+def stage_blob(stream, root):
+    """Stream ``stream`` into a temporary file in the store while hashing it.
+
+    Returns ``(blob_id, size, partial_path)``; pass the path to place_blob.
+    """
+    os.makedirs(root, exist_ok=True)
+    digest, size = hashlib.sha256(), 0
+    fd, partial = tempfile.mkstemp(dir=root, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+    except Exception:
+        os.remove(partial)
+        raise
+    return digest.hexdigest(), size, partial
+
+
+def place_blob(partial, blob_id, root):
+    """Move a staged file to its content path; content already stored is not written twice."""
+    path = blob_path(blob_id, root)
+    if os.path.exists(path):
+        os.remove(partial)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(partial, path)
+
+
+def write_blob(stream, root):
+    """Stage and place ``stream`` in one step. Returns ``(blob_id, size)``.
+
+    Only for callers that cannot race with deletes, such as migrations;
+    requests go through save_upload.
+    """
+    blob_id, size, partial = stage_blob(stream, root)
+    place_blob(partial, blob_id, root)
+    return blob_id, size
+
+
+#REFERENCES
+def add_reference(executor, blob_id, size, content_type):
+    """Count one more reference to a blob, creating its row on first use.
+
+    ``executor`` is a session or connection, so migrations can use it too.
+    """
+    increment_row(executor, DocumentBlob.__table__, {"id": blob_id}, {"ref_count": 1},
+                  size=size, content_type=content_type, created_at=datetime.utcnow())
+
+
+def save_upload(file_obj):
+    """Store an uploaded file and reference it. Returns the blob id, or None when nothing was uploaded.
+
+    The reference is written before the file is placed. That write waits
+    on any remove_blob_files transaction holding the same row, so the
+    file is put back if a delete removed it in the meantime.
+    """
+    if not file_obj or not getattr(file_obj, "filename", None):
+        return None
+    root = blob_root()
+    blob_id, size, partial = stage_blob(file_obj.stream, root)
+    try:
+        add_reference(db.session, blob_id, size, file_obj.mimetype or None)
+        place_blob(partial, blob_id, root)
+    except Exception:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return blob_id
+
+
+def release_blobs(blob_ids):
+    """Drop one reference per id and return the ids left unreferenced.
+
+    Call before the commit and pass the result to remove_blob_files
+    after it. Rows are kept at zero until then.
+    """
+    table = DocumentBlob.__table__
+    orphaned = []
+    for blob_id in filter(None, blob_ids):
+        db.session.execute(update(table).where(table.c.id == blob_id)
+                           .values(ref_count=table.c.ref_count - 1))
+        if db.session.execute(select(table.c.ref_count).where(table.c.id == blob_id)).scalar() == 0:
+            orphaned.append(blob_id)
+    return orphaned
+
+
+def remove_blob_files(blob_ids):
+    """Delete unreferenced blobs, skipping any referenced again since.
+
+    Each row is deleted and its file unlinked inside one transaction, so
+    a concurrent save_upload of the same bytes blocks on the row until
+    the file is gone and then writes it again.
+    """
+    table = DocumentBlob.__table__
+    for blob_id in blob_ids:
+        try:
+            if db.session.execute(delete(table).where(table.c.id == blob_id, table.c.ref_count <= 0)).rowcount:
+                try:
+                    os.remove(blob_path(blob_id))
+                except FileNotFoundError:
+                    pass
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
@@ -0,0 +1,39 @@
+from sqlalchemy import insert, update
+from sqlalchemy.dialects import mysql, sqlite
+
+
+def _dialect_name(executor):
+    dialect = getattr(executor, "dialect", None) or executor.get_bind().dialect
+    return dialect.name
+
+
+def increment_row(executor, table, key, counts, **values):
+    """Add ``counts`` to the row matching ``key``, inserting it with them if it is missing.
+
+    ``key`` maps the columns of a unique constraint to their values and
+    ``values`` only apply to a new row. On SQLite and MySQL this is one
+    upsert, so concurrent writers cannot both insert the same row. NULL
+    keys never conflict in a unique index, so those rows (and other
+    dialects) fall back to UPDATE, then INSERT when nothing matched.
+    """
+    row = {**key, **counts, **values}
+    dialect = _dialect_name(executor)
+    if None not in key.values() and dialect == "sqlite":
+        statement = sqlite.insert(table).values(row)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(key),
+            set_={column: table.c[column] + statement.excluded[column] for column in counts})
+    elif None not in key.values() and dialect == "mysql":
+        statement = mysql.insert(table).values(row)
+        statement = statement.on_duplicate_key_update(
+            {column: table.c[column] + statement.inserted[column] for column in counts})
+    else:
+        updated = executor.execute(
+            update(table)
+            .where(*[table.c[column] == value for column, value in key.items()])
+            .values({column: table.c[column] + delta for column, delta in counts.items()})
+        ).rowcount
+        if updated:
+            return
+        statement = insert(table).values(row)
+    executor.execute(statement)